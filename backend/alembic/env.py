@@ -17,10 +17,12 @@ from app.shared.models.user import User
 from app.shared.models.role import Role
 from app.shared.models.school import School
 from app.modules.academics.models import AcademicYear, Term, ClassRoom, Stream
-from app.modules.evoucher.models import EVoucher, VoucherAttemptLog
+from app.modules.evoucher.models import EVoucher, VoucherAttemptLog, VoucherBatchJob
 from app.modules.students.models import Student, Guardian, StudentMedical, StudentAccount
-from app.modules.admissions.models import Admission
+from app.modules.admissions.models import Admission, AdmissionDraft, IndexNumberSequence
+from app.modules.media.models import MediaObject
 from app.shared.models.audit import AuditLog
+from app.shared.models.idempotency import IdempotencyKey
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
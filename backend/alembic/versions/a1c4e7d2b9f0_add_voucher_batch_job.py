@@ -0,0 +1,45 @@
+"""add voucher batch job
+
+Revision ID: a1c4e7d2b9f0
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-18 09:12:31.482113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4e7d2b9f0'
+down_revision: Union[str, Sequence[str], None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('voucherbatchjob',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('academic_year_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('Queued', 'Running', 'Completed', 'Failed', name='voucherbatchjobstatus'), nullable=True),
+    sa.Column('generated_count', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by_admin_id', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['academic_year_id'], ['academicyear.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voucherbatchjob_id'), 'voucherbatchjob', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_voucherbatchjob_id'), table_name='voucherbatchjob')
+    op.drop_table('voucherbatchjob')
+    sa.Enum(name='voucherbatchjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,50 @@
+"""add index number sequence
+
+Revision ID: a8c5e2f4b710
+Revises: f6b3d1e8a907
+Create Date: 2026-10-18 16:40:26.775190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c5e2f4b710'
+down_revision: Union[str, Sequence[str], None] = 'f6b3d1e8a907'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('indexnumbersequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('academic_year_id', sa.Integer(), nullable=False),
+    sa.Column('level_code', sa.String(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['academic_year_id'], ['academicyear.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('academic_year_id', 'level_code', name='uq_indexnumbersequence_year_level')
+    )
+    op.create_index(op.f('ix_indexnumbersequence_id'), 'indexnumbersequence', ['id'], unique=False)
+
+    # Continue from the old numbering, which counted approvals per year across all levels
+    op.execute("""
+        INSERT INTO indexnumbersequence (academic_year_id, level_code, last_value)
+        SELECT a.academic_year_id, UPPER(SUBSTR(c.level, 1, 3)),
+               (SELECT COUNT(*) FROM admission a2
+                WHERE a2.academic_year_id = a.academic_year_id AND a2.status = 'Approved')
+        FROM admission a
+        JOIN classroom c ON c.id = a.class_id
+        WHERE a.status = 'Approved'
+        GROUP BY a.academic_year_id, UPPER(SUBSTR(c.level, 1, 3))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_indexnumbersequence_id'), table_name='indexnumbersequence')
+    op.drop_table('indexnumbersequence')
@@ -0,0 +1,28 @@
+"""add voucher batch job heartbeat
+
+Revision ID: a9d2e6f4c130
+Revises: f7b1d4e9a258
+Create Date: 2026-10-18 21:42:17.306518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d2e6f4c130'
+down_revision: Union[str, Sequence[str], None] = 'f7b1d4e9a258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('voucherbatchjob', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('voucherbatchjob', 'heartbeat_at')
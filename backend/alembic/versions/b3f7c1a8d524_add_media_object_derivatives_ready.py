@@ -0,0 +1,29 @@
+"""add media object derivatives ready
+
+Revision ID: b3f7c1a8d524
+Revises: a9d2e6f4c130
+Create Date: 2026-10-18 22:15:48.630194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7c1a8d524'
+down_revision: Union[str, Sequence[str], None] = 'a9d2e6f4c130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing objects are unverified; POST /media/admin/backfill-derivatives flags or builds them
+    op.add_column('mediaobject', sa.Column('derivatives_ready', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mediaobject', 'derivatives_ready')
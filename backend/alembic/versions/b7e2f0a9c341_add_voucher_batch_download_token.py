@@ -0,0 +1,34 @@
+"""add voucher batch download token
+
+Revision ID: b7e2f0a9c341
+Revises: a1c4e7d2b9f0
+Create Date: 2026-10-18 10:41:07.113905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f0a9c341'
+down_revision: Union[str, Sequence[str], None] = 'a1c4e7d2b9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('voucherbatchjob', sa.Column('stream_on_download', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('voucherbatchjob', sa.Column('download_token_hash', sa.String(), nullable=True))
+    op.add_column('voucherbatchjob', sa.Column('downloaded_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_voucherbatchjob_download_token_hash'), 'voucherbatchjob', ['download_token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_voucherbatchjob_download_token_hash'), table_name='voucherbatchjob')
+    op.drop_column('voucherbatchjob', 'downloaded_at')
+    op.drop_column('voucherbatchjob', 'download_token_hash')
+    op.drop_column('voucherbatchjob', 'stream_on_download')
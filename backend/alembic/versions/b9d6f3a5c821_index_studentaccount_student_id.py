@@ -0,0 +1,28 @@
+"""index studentaccount student_id
+
+Revision ID: b9d6f3a5c821
+Revises: a8c5e2f4b710
+Create Date: 2026-10-18 17:25:03.418226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d6f3a5c821'
+down_revision: Union[str, Sequence[str], None] = 'a8c5e2f4b710'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_studentaccount_student_id'), 'studentaccount', ['student_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_studentaccount_student_id'), table_name='studentaccount')
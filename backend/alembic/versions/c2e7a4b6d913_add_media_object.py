@@ -0,0 +1,42 @@
+"""add media object
+
+Revision ID: c2e7a4b6d913
+Revises: b9d6f3a5c821
+Create Date: 2026-10-18 18:02:47.190382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7a4b6d913'
+down_revision: Union[str, Sequence[str], None] = 'b9d6f3a5c821'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mediaobject',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_uploaded_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('storage_key')
+    )
+    op.create_index(op.f('ix_mediaobject_id'), 'mediaobject', ['id'], unique=False)
+    op.create_index(op.f('ix_mediaobject_sha256'), 'mediaobject', ['sha256'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_mediaobject_sha256'), table_name='mediaobject')
+    op.drop_index(op.f('ix_mediaobject_id'), table_name='mediaobject')
+    op.drop_table('mediaobject')
@@ -0,0 +1,33 @@
+"""add evoucher keyset indexes
+
+Revision ID: c3d8a5f1e624
+Revises: b7e2f0a9c341
+Create Date: 2026-10-18 12:05:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8a5f1e624'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f0a9c341'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_evoucher_academic_year_id_status_id', 'evoucher', ['academic_year_id', 'status', 'id'], unique=False)
+    op.create_index(
+        'ix_evoucher_voucher_number_pattern', 'evoucher', ['voucher_number'], unique=False,
+        postgresql_ops={'voucher_number': 'varchar_pattern_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_evoucher_voucher_number_pattern', table_name='evoucher')
+    op.drop_index('ix_evoucher_academic_year_id_status_id', table_name='evoucher')
@@ -0,0 +1,34 @@
+"""add evoucher batch job id
+
+Revision ID: c6e1f8a3d492
+Revises: b3f7c1a8d524
+Create Date: 2026-10-18 23:04:51.227106
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e1f8a3d492'
+down_revision: Union[str, Sequence[str], None] = 'b3f7c1a8d524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('evoucher') as batch_op:
+        batch_op.add_column(sa.Column('batch_job_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_evoucher_batch_job_id', 'voucherbatchjob', ['batch_job_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_evoucher_batch_job_id'), ['batch_job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('evoucher') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_evoucher_batch_job_id'))
+        batch_op.drop_constraint('fk_evoucher_batch_job_id', type_='foreignkey')
+        batch_op.drop_column('batch_job_id')
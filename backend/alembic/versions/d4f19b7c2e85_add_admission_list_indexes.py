@@ -0,0 +1,44 @@
+"""add admission list and trigram search indexes
+
+Revision ID: d4f19b7c2e85
+Revises: c3d8a5f1e624
+Create Date: 2026-10-18 13:22:40.561032
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f19b7c2e85'
+down_revision: Union[str, Sequence[str], None] = 'c3d8a5f1e624'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_student_first_name_trgm', 'student', 'first_name'),
+    ('ix_student_last_name_trgm', 'student', 'last_name'),
+    ('ix_evoucher_voucher_number_trgm', 'evoucher', 'voucher_number'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_admission_created_at_id', 'admission', ['created_at', 'id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index('ix_admission_created_at_id', table_name='admission')
@@ -0,0 +1,68 @@
+"""add admission voucher unique index
+
+Revision ID: d5f8b2c7e036
+Revises: c2e7a4b6d913
+Create Date: 2026-10-18 19:12:05.418263
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f8b2c7e036'
+down_revision: Union[str, Sequence[str], None] = 'c2e7a4b6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Resubmits with the same voucher session used to create one Pending
+# admission each. Keep one live admission per voucher (an Approved one if
+# any, otherwise the newest) and reject the rest, or the index can't be built.
+DUPLICATES = """
+    SELECT id, kept_id FROM (
+        SELECT id,
+            FIRST_VALUE(id) OVER voucher_window AS kept_id,
+            ROW_NUMBER() OVER voucher_window AS position
+        FROM admission
+        WHERE voucher_id IS NOT NULL AND status != 'Rejected'
+        WINDOW voucher_window AS (
+            PARTITION BY voucher_id
+            ORDER BY CASE WHEN status = 'Approved' THEN 0 ELSE 1 END, created_at DESC, id DESC
+        )
+    ) ranked
+    WHERE position > 1
+"""
+
+
+def reject_duplicate_admissions() -> None:
+    op.execute(sa.text(f"""
+        INSERT INTO auditlog (entity, entity_id, action, notes, created_at)
+        SELECT 'Admission', id, 'REJECT',
+            'Duplicate submission for the same voucher; admission ' || kept_id || ' was kept.', :now
+        FROM ({DUPLICATES}) duplicates
+    """).bindparams(now=datetime.utcnow()))
+    # The rejected admissions' students are no longer pending anything
+    op.execute(f"""
+        UPDATE student SET pending_admission_id = NULL, enrollment_status = 'Inactive'
+        WHERE enrollment_status = 'Pending Approval'
+            AND pending_admission_id IN (SELECT id FROM ({DUPLICATES}) duplicates)
+    """)
+    op.execute(f"""
+        UPDATE admission SET status = 'Rejected'
+        WHERE id IN (SELECT id FROM ({DUPLICATES}) duplicates)
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    reject_duplicate_admissions()
+    op.create_index('uq_admission_voucher_id_active', 'admission', ['voucher_id'], unique=True, postgresql_where=sa.text("status != 'Rejected'"), sqlite_where=sa.text("status != 'Rejected'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_admission_voucher_id_active', table_name='admission', postgresql_where=sa.text("status != 'Rejected'"), sqlite_where=sa.text("status != 'Rejected'"))
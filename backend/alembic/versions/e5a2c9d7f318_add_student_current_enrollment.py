@@ -0,0 +1,73 @@
+"""add student current enrollment columns
+
+Revision ID: e5a2c9d7f318
+Revises: d4f19b7c2e85
+Create Date: 2026-10-18 14:47:09.218774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c9d7f318'
+down_revision: Union[str, Sequence[str], None] = 'd4f19b7c2e85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _latest(column: str, status: str) -> str:
+    return (
+        f"(SELECT a.{column} FROM admission a WHERE a.student_id = student.id AND a.status = '{status}' "
+        f"ORDER BY a.created_at DESC, a.id DESC LIMIT 1)"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.add_column(sa.Column('current_academic_year_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('current_class_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('current_stream_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('pending_admission_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('enrollment_status', sa.String(), server_default='Inactive', nullable=False))
+        batch_op.create_foreign_key('fk_student_current_academic_year_id', 'academicyear', ['current_academic_year_id'], ['id'])
+        batch_op.create_foreign_key('fk_student_current_class_id', 'classroom', ['current_class_id'], ['id'])
+        batch_op.create_foreign_key('fk_student_current_stream_id', 'stream', ['current_stream_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_student_current_academic_year_id'), ['current_academic_year_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_current_class_id'), ['current_class_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_current_stream_id'), ['current_stream_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_enrollment_status'), ['enrollment_status'], unique=False)
+
+    # Backfill from existing admissions (same rules as StudentService.refresh_current_enrollment)
+    op.execute(f"""
+        UPDATE student SET
+            current_academic_year_id = {_latest('academic_year_id', 'Approved')},
+            current_class_id = {_latest('class_id', 'Approved')},
+            current_stream_id = {_latest('stream_id', 'Approved')},
+            pending_admission_id = {_latest('id', 'Pending')},
+            enrollment_status = CASE
+                WHEN EXISTS (SELECT 1 FROM admission a WHERE a.student_id = student.id AND a.status = 'Approved') THEN 'Active'
+                WHEN EXISTS (SELECT 1 FROM admission a WHERE a.student_id = student.id AND a.status = 'Pending') THEN 'Pending Approval'
+                ELSE 'Inactive'
+            END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_student_enrollment_status'))
+        batch_op.drop_index(batch_op.f('ix_student_current_stream_id'))
+        batch_op.drop_index(batch_op.f('ix_student_current_class_id'))
+        batch_op.drop_index(batch_op.f('ix_student_current_academic_year_id'))
+        batch_op.drop_constraint('fk_student_current_stream_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_student_current_class_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_student_current_academic_year_id', type_='foreignkey')
+        batch_op.drop_column('enrollment_status')
+        batch_op.drop_column('pending_admission_id')
+        batch_op.drop_column('current_stream_id')
+        batch_op.drop_column('current_class_id')
+        batch_op.drop_column('current_academic_year_id')
@@ -0,0 +1,41 @@
+"""add idempotency key
+
+Revision ID: e6a9c3d8f147
+Revises: d5f8b2c7e036
+Create Date: 2026-10-18 20:03:41.902716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a9c3d8f147'
+down_revision: Union[str, Sequence[str], None] = 'd5f8b2c7e036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('idempotencykey',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_idempotencykey_expires_at'), 'idempotencykey', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_idempotencykey_key'), 'idempotencykey', ['key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotencykey_key'), table_name='idempotencykey')
+    op.drop_index(op.f('ix_idempotencykey_expires_at'), table_name='idempotencykey')
+    op.drop_table('idempotencykey')
@@ -0,0 +1,37 @@
+"""add student directory indexes
+
+Revision ID: f6b3d1e8a907
+Revises: e5a2c9d7f318
+Create Date: 2026-10-18 15:58:14.330276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b3d1e8a907'
+down_revision: Union[str, Sequence[str], None] = 'e5a2c9d7f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_student_city'), 'student', ['city'], unique=False)
+    op.create_index('ix_student_last_name_first_name_id', 'student', ['last_name', 'first_name', 'id'], unique=False)
+    op.create_index('ix_student_created_at_id', 'student', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_student_current_class_id_last_name_first_name_id', 'student',
+        ['current_class_id', 'last_name', 'first_name', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_current_class_id_last_name_first_name_id', table_name='student')
+    op.drop_index('ix_student_created_at_id', table_name='student')
+    op.drop_index('ix_student_last_name_first_name_id', table_name='student')
+    op.drop_index(op.f('ix_student_city'), table_name='student')
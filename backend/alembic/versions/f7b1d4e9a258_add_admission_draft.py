@@ -0,0 +1,42 @@
+"""add admission draft
+
+Revision ID: f7b1d4e9a258
+Revises: e6a9c3d8f147
+Create Date: 2026-10-18 20:47:19.226830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b1d4e9a258'
+down_revision: Union[str, Sequence[str], None] = 'e6a9c3d8f147'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('admissiondraft',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('voucher_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['voucher_id'], ['evoucher.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admissiondraft_expires_at'), 'admissiondraft', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_admissiondraft_voucher_id'), 'admissiondraft', ['voucher_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_admissiondraft_voucher_id'), table_name='admissiondraft')
+    op.drop_index(op.f('ix_admissiondraft_expires_at'), table_name='admissiondraft')
+    op.drop_table('admissiondraft')
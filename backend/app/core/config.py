@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator, Field
-from typing import List, Union, Literal, Optional
+from typing import Dict, List, Union, Literal, Optional
 from pathlib import Path
 
 class Settings(BaseSettings):
@@ -23,14 +23,94 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(..., min_length=32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_ROUNDS: int = 29000 # pbkdf2_sha256; passlib's default
+    # Resolved student principals, per worker; also capped by each token's remaining lifetime
+    STUDENT_PRINCIPAL_CACHE_SIZE: int = 10000
+    STUDENT_PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+
+    # Student login: failed attempts per client IP (see TRUSTED_PROXY_HOPS) and per account
+    STUDENT_LOGIN_IP_LIMIT: int = 20
+    STUDENT_LOGIN_ACCOUNT_LIMIT: int = 5
+    STUDENT_LOGIN_WINDOW_SECONDS: int = 900
 
     ENVIRONMENT: Literal["development", "staging", "production"] = "development"
 
     MEDIA_URL: str = "/media"
     UPLOAD_DIR: str = "uploads"
+    MEDIA_MAX_UPLOAD_SIZE: int = 1 * 1024 * 1024 # 1MB
+    MEDIA_MAX_IMAGE_PIXELS: int = 25_000_000 # decompression bomb guard for derivatives
+    # "local" keeps media under UPLOAD_DIR; "s3" uses any S3-compatible bucket (needs boto3)
+    MEDIA_STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    MEDIA_S3_BUCKET: Optional[str] = None
+    MEDIA_S3_ENDPOINT_URL: Optional[str] = None
+    MEDIA_S3_PREFIX: str = ""
+    MEDIA_S3_PUBLIC_URL: Optional[str] = None
+    # Unreferenced media younger than this is kept, so an upload survives until the form using it is saved
+    MEDIA_GC_GRACE_HOURS: int = 24
+    # e.g. "/protected-media": let nginx send local media files via X-Accel-Redirect
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None
 
     PORT: int = 8001
 
+    # Access log: path prefix -> fraction of requests logged (errors and slow requests always are)
+    LOG_ACCESS_SAMPLE_RATES: Dict[str, float] = {"/api/v1/evoucher/check-session": 0.05}
+    LOG_SLOW_REQUEST_MS: float = 1000
+
+    # SQL profiler for development/staging: per-request statement log, N+1
+    # detection (same statement shape repeated this many times) and query budgets
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_REPEAT_THRESHOLD: int = 5
+    # Fail the statement that takes a route past its declared query budget
+    SQL_PROFILER_STRICT: bool = False
+
+    # Connection pools (per worker process, for each of the sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 0 # 0 disables the server-side timeout
+    # Expose /health/db-pool (worker pid and pool internals); keep it off on public deployments
+    DB_POOL_REPORT_ENABLED: bool = False
+
+    # Background processing
+    CPU_POOL_WORKERS: int = 2
+
+    # E-Voucher batch generation
+    VOUCHER_BATCH_CHUNK_SIZE: int = 1000
+    VOUCHER_EXPORT_DIR: str = "exports"
+    # Jobs without progress for this long lost their worker (restart, timeout)
+    VOUCHER_BATCH_JOB_STALE_MINUTES: int = 10
+
+    # E-Voucher verification
+    VOUCHER_STATUS_CACHE_SIZE: int = 50000
+    VOUCHER_STATUS_CACHE_TTL_SECONDS: int = 300
+    VOUCHER_NEGATIVE_CACHE_TTL_SECONDS: int = 30
+    VOUCHER_ATTEMPT_LOG_FLUSH_SECONDS: float = 2.0
+    VOUCHER_ATTEMPT_LOG_BATCH_SIZE: int = 500
+    VOUCHER_ATTEMPT_LOG_MAX_BUFFER: int = 20000
+    # Per client IP as resolved through TRUSTED_PROXY_HOPS; a wrong hop count
+    # collapses every applicant into the proxy's bucket
+    VOUCHER_VERIFY_IP_LIMIT: int = 30
+    VOUCHER_VERIFY_NUMBER_LIMIT: int = 5
+    VOUCHER_VERIFY_WINDOW_SECONDS: int = 900
+    VOUCHER_SWEEP_ENABLED: bool = True
+    VOUCHER_SWEEP_INTERVAL_SECONDS: int = 60
+
+    # Idempotent admission submission: how long responses are replayed, and
+    # after how long an unfinished claim is considered abandoned
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60
+    # Submits are only retried within a voucher session, so no need for a day
+    ADMISSION_IDEMPOTENCY_TTL_MINUTES: int = 60
+
+    # Proxies in front of the app that append to X-Forwarded-For (Railway's
+    # edge: 1). 0 uses the socket peer; only then is the header ignored.
+    TRUSTED_PROXY_HOPS: int = 1
+
+    # Rate limiting ("redis" shares counters across workers)
+    THROTTLE_BACKEND: Literal["memory", "redis"] = "memory"
+    REDIS_URL: Optional[str] = None
+
     BACKEND_CORS_ORIGINS: List[str] = []
 
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
@@ -67,4 +147,18 @@ class Settings(BaseSettings):
             return self.DATABASE_URL.replace("postgres://", "postgresql://", 1)
         return self.DATABASE_URL
 
+    @property
+    def async_database_uri(self) -> str:
+        # Same database through an asyncio driver: asyncpg, or aiosqlite for local SQLite files
+        uri = self.sqlalchemy_database_uri
+        for prefix, async_prefix in (
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if uri.startswith(prefix):
+                return uri.replace(prefix, async_prefix, 1)
+        return uri
+
 settings = Settings()
@@ -1,3 +1,4 @@
 # System-wide constants
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
+MAX_BULK_ADMISSIONS = 500
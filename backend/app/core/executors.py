@@ -0,0 +1,68 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared process pool for CPU-bound work (PIN/password hashing) so it never
+# runs on the request thread. Created lazily, one per gunicorn worker.
+_process_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _lock:
+            if _process_pool is None:
+                # "spawn" avoids forking a multi-threaded worker process
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.CPU_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _process_pool
+
+def _discard_broken(pool: ProcessPoolExecutor):
+    # A pool whose child died (OOM kill, segfault) fails every later submit
+    # and never recovers; it has already terminated its workers, so just
+    # drop it and let the next caller create a fresh one
+    global _process_pool
+    with _lock:
+        if _process_pool is pool:
+            logger.warning("Process pool is broken; replacing it")
+            _process_pool = None
+
+def _on_done(pool: ProcessPoolExecutor, future: Future):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        _discard_broken(pool)
+
+def submit_to_process_pool(fn: Callable, *args) -> Future:
+    """
+    Submit `fn(*args)` to the shared process pool. A broken pool is replaced:
+    at submit time the call is retried on the new one (it never ran), and a
+    future failed by a dying child drops the pool for the next caller.
+    """
+    pool = get_process_pool()
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard_broken(pool)
+        pool = get_process_pool()
+        future = pool.submit(fn, *args)
+    future.add_done_callback(lambda f: _on_done(pool, f))
+    return future
+
+def map_on_process_pool(fn: Callable, items: Iterable) -> List:
+    """Run `fn` over `items` on the shared process pool, in order."""
+    futures = [submit_to_process_pool(fn, item) for item in items]
+    return [future.result() for future in futures]
+
+def shutdown_executors():
+    global _process_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,113 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.shared.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, so a key can't be replayed for a different request."""
+    return _sha256(json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")))
+
+@dataclass
+class IdempotencyClaim:
+    id: Optional[int] = None
+    replay: Optional[JSONResponse] = None
+
+class IdempotencyService:
+    """
+    Claim-then-complete deduplication of non-idempotent requests. The first
+    request with a key claims it and runs; retries get its stored response,
+    or 409 while it is still running. Only successes are stored: a failed
+    request releases its claim so the client can retry.
+    """
+
+    @staticmethod
+    def storage_key(scope: str, client_key: str) -> str:
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+        return _sha256(f"{scope}:{client_key}")
+
+    @staticmethod
+    def claim(db: Session, key: str, request_hash: str, ttl: Optional[timedelta] = None) -> IdempotencyClaim:
+        now = datetime.utcnow()
+        expires_at = now + (ttl or timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS))
+        try:
+            claim_id = db.execute(insert(IdempotencyKey).values(
+                key=key, request_hash=request_hash, created_at=now, expires_at=expires_at
+            ).returning(IdempotencyKey.id)).scalar_one()
+            db.commit()
+            return IdempotencyClaim(id=claim_id)
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.key == key).with_for_update()
+        ).scalar_one_or_none()
+        if existing is None:
+            # Purged between our insert and this read
+            return IdempotencyService.claim(db, key, request_hash, ttl)
+
+        abandoned = existing.status_code is None and \
+            existing.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        if existing.expires_at <= now or abandoned:
+            existing.request_hash = request_hash
+            existing.status_code = None
+            existing.response_body = None
+            existing.created_at = now
+            existing.expires_at = expires_at
+            db.commit()
+            return IdempotencyClaim(id=existing.id)
+
+        status_code, response_body, same_request = existing.status_code, existing.response_body, existing.request_hash == request_hash
+        db.rollback()
+        if not same_request:
+            raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        if status_code is None:
+            raise HTTPException(
+                status_code=409,
+                detail="This request is still being processed",
+                headers={"Retry-After": "1"}
+            )
+        return IdempotencyClaim(replay=JSONResponse(
+            content=json.loads(response_body),
+            status_code=status_code,
+            headers={"Idempotent-Replayed": "true"}
+        ))
+
+    @staticmethod
+    def complete(db: Session, claim: IdempotencyClaim, status_code: int, content: Any):
+        """Store the response for replays; callers strip credentials from `content` first."""
+        db.execute(
+            update(IdempotencyKey).where(IdempotencyKey.id == claim.id).values(
+                status_code=status_code, response_body=json.dumps(jsonable_encoder(content))
+            )
+        )
+        db.commit()
+
+    @staticmethod
+    def release(db: Session, claim: IdempotencyClaim):
+        db.rollback()
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == claim.id))
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Delete expired keys; the caller commits."""
+        return db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
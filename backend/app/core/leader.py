@@ -0,0 +1,88 @@
+import fcntl
+import logging
+import os
+import tempfile
+import zlib
+from typing import Optional
+from sqlalchemy import text
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+class LeaderLock:
+    """
+    Non-blocking, process-lifetime lock used to elect one gunicorn worker
+    for singleton background work. On PostgreSQL it is a session-level
+    advisory lock held on a dedicated connection, so it is released as soon
+    as the holder dies; elsewhere it falls back to a local file lock.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = zlib.crc32(name.encode())
+        self._connection = None
+        self._file: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None or self._file is not None
+
+    def acquire(self) -> bool:
+        if self.held:
+            return self._check()
+        try:
+            if engine.dialect.name == "postgresql":
+                connection = engine.connect()
+                acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+                connection.commit()
+                if acquired:
+                    self._connection = connection
+                else:
+                    connection.close()
+                return bool(acquired)
+
+            path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self._file = fd
+            return True
+        except Exception:
+            logger.exception(f"Failed to acquire leader lock {self.name}")
+            self.release()
+            return False
+
+    def _check(self) -> bool:
+        # A dropped connection silently loses the advisory lock
+        if self._connection is None:
+            return True
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception:
+            logger.warning(f"Lost connection holding leader lock {self.name}")
+            self.release()
+            return False
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                self._connection.commit()
+            except Exception:
+                pass
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+        if self._file is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            finally:
+                os.close(self._file)
+                self._file = None
@@ -1,25 +1,79 @@
+import atexit
+import contextvars
+import json
 import logging
+import queue
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from app.core.config import settings
 
+ACCESS_LOGGER = "app.access"
+SQL_PROFILE_LOGGER = "app.sql_profile"
+# Loggers written as JSON lines rather than text
+STRUCTURED_LOGGERS = frozenset({ACCESS_LOGGER, SQL_PROFILE_LOGGER})
+
+# Set by the request middleware for the lifetime of each request
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed as extra={"fields": {...}} are merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, default=str)
+
+_listener: Optional[QueueListener] = None
+
 def setup_logging():
+    global _listener
     # Define log format
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
+
+    text_handler = logging.StreamHandler(sys.stdout)
+    text_handler.setFormatter(logging.Formatter(log_format))
+    text_handler.addFilter(lambda record: record.name not in STRUCTURED_LOGGERS)
+    access_handler = logging.StreamHandler(sys.stdout)
+    access_handler.setFormatter(JsonFormatter())
+    access_handler.addFilter(lambda record: record.name in STRUCTURED_LOGGERS)
+
+    # Request threads only enqueue records; a listener thread formats and writes them
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    queue_handler.addFilter(RequestIdFilter())
+
+    if _listener:
+        _listener.stop()
+    _listener = QueueListener(log_queue, text_handler, access_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
     # Force new configuration to override any existing (e.g., uvicorn defaults)
     logging.basicConfig(
         level=logging.INFO,
-        format=log_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ],
+        handlers=[queue_handler],
         force=True
     )
 
     # Specific logger for application
     logger = logging.getLogger("app")
     logger.setLevel(logging.INFO)
-    
+
     # Silence uvicorn access logs to avoid double logging
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
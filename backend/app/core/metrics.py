@@ -0,0 +1,129 @@
+import contextvars
+import os
+import time
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import NoMatchFound
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) every worker writes
+# its samples to files there and /metrics aggregates them across workers.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ["method"], multiprocess_mode="livesum"
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed")
+DB_QUERY_TIME = Counter("db_query_seconds_total", "Time spent executing SQL statements")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements per HTTP request", ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_query_seconds_per_request", "SQL time per HTTP request", ["route"], buckets=LATENCY_BUCKETS
+)
+VOUCHER_VERIFICATIONS = Counter(
+    "voucher_verifications_total", "Voucher verification attempts by outcome", ["outcome"]
+)
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+# Per-request statement tally. Set to a mutable object by the middleware so the
+# copies of the context that threadpool and greenlet work run in update it too.
+query_stats_var: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+def instrument_query_metrics(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERIES.inc()
+        DB_QUERY_TIME.inc(elapsed)
+        stats = query_stats_var.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+def route_template(scope: Scope) -> str:
+    """
+    Full path template of the matched route, e.g. /api/v1/students/{student_id}.
+    Templates rather than raw paths keep label cardinality bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Included routes carry only their own part of the template; recover the
+    # router prefix by rendering that part and stripping it off the real path.
+    try:
+        own_path = str(route.url_path_for(route.name, **scope.get("path_params", {})))
+    except NoMatchFound:
+        return route.path
+    path = scope["path"]
+    prefix = path[:-len(own_path)] if own_path and path.endswith(own_path) else ""
+    return prefix + route.path
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts, latency and SQL per request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = QueryStats()
+        token = query_stats_var.set(stats)
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            query_stats_var.reset(token)
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(duration)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.seconds)
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint, aggregated across workers when multiprocess."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,48 +1,90 @@
-import time
 import logging
-import traceback
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import random
+import re
+import time
+import uuid
+from typing import Dict, Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
+from app.core.logging_config import ACCESS_LOGGER, request_id_var
 
 logger = logging.getLogger("app.middleware")
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+# Accept a caller's request ID only if it is short and header-safe
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+class LoggingMiddleware:
+    """
+    Pure ASGI request instrumentation: assigns a request ID, times the request
+    on a monotonic clock and emits one JSON access record when it finishes.
+    Routes listed in `sample_rates` (path prefix -> fraction) are logged only
+    for that fraction of requests, except errors and slow requests.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rates: Optional[Dict[str, float]] = None,
+        slow_request_ms: Optional[float] = None
+    ):
+        self.app = app
+        self.sample_rates = sorted(
+            (sample_rates if sample_rates is not None else settings.LOG_ACCESS_SAMPLE_RATES).items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.slow_request_ms = settings.LOG_SLOW_REQUEST_MS if slow_request_ms is None else slow_request_ms
+
+    def _sample_rate(self, path: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        incoming_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming_id if REQUEST_ID_PATTERN.match(incoming_id) else uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+        status_code = 500
+
+        async def send_with_headers(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = f"{(time.perf_counter() - start) * 1000:.2f}"
+            await send(message)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        path = request.url.path
-        
-        logger.info(f"Request started: {method} {path} from {client_ip}")
-        
         try:
-            response = await call_next(request)
-            process_time = (time.time() - start_time) * 1000
-            formatted_process_time = "{0:.2f}".format(process_time)
-            
-            logger.info(
-                f"Request completed: {method} {path} - Status: {response.status_code} - "
-                f"Duration: {formatted_process_time}ms"
-            )
-            
-            response.headers["X-Process-Time"] = formatted_process_time
-            return response
-            
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
-            process_time = (time.time() - start_time) * 1000
-            formatted_process_time = "{0:.2f}".format(process_time)
-            
-            # Global exception handling for middleware level
-            if settings.ENVIRONMENT == "development":
-                stack_trace = traceback.format_exc()
-                logger.error(
-                    f"Request failed: {method} {path} - Error: {str(e)}\n{stack_trace}"
-                )
-            else:
-                logger.error(
-                    f"Request failed: {method} {path} - Error: {str(e)}"
-                )
-            
-            # Re-raise to be caught by the global exception handler in main.py
-            raise e
+            # Re-raised to be caught by the global exception handler in main.py
+            logger.error(
+                f"Request failed: {scope['method']} {scope['path']} - Error: {str(e)}",
+                exc_info=settings.ENVIRONMENT == "development"
+            )
+            status_code = 500
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            rate = self._sample_rate(scope["path"])
+            if status_code >= 500 or duration_ms >= self.slow_request_ms or rate >= 1.0 or random.random() < rate:
+                client = scope.get("client")
+                access_logger.info("request", extra={"fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "client_ip": client[0] if client else "unknown",
+                    "sample_rate": rate,
+                }})
+            request_id_var.reset(token)
@@ -0,0 +1,83 @@
+import base64
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+# Keyset (cursor) pagination helpers. A cursor is an opaque, URL-safe
+# encoding of the sort-key values of the last row on the previous page.
+
+def encode_cursor(values: List[Any]) -> str:
+    def default(v):
+        if isinstance(v, datetime):
+            return {"__dt__": v.isoformat()}
+        if isinstance(v, date):
+            return {"__d__": v.isoformat()}
+        if hasattr(v, "value"):
+            return v.value
+        raise TypeError(f"Cannot encode {type(v)!r} in cursor")
+    raw = json.dumps(values, default=default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_value(obj: dict) -> Any:
+    if "__dt__" in obj:
+        return datetime.fromisoformat(obj["__dt__"])
+    if "__d__" in obj:
+        return date.fromisoformat(obj["__d__"])
+    return obj
+
+def _check_value(value: Any, expected: type) -> Any:
+    if value is None:
+        return None
+    if issubclass(expected, enum.Enum):
+        return expected(value)
+    # bool is an int, but never a valid key value
+    if isinstance(value, bool) or not isinstance(value, expected):
+        raise TypeError(f"Expected {expected.__name__}")
+    return value
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[List[Any]]:
+    """
+    Sort-key values from `cursor`, checked against `types` (one per key
+    column) so a tampered cursor is a 400 here, not a database error.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw, object_hook=_decode_value)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Wrong number of values")
+        return [_check_value(value, expected) for value, expected in zip(values, types)]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def estimate_count(db: Session, query) -> int:
+    """
+    Planner row estimate for a query on PostgreSQL (no table scan);
+    falls back to an exact count on other databases.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.order_by(None).count()
+    plan = db.execute(_Explain(query.order_by(None).statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
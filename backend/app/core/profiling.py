@@ -0,0 +1,177 @@
+import contextvars
+import hashlib
+import logging
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.logging_config import SQL_PROFILE_LOGGER
+from app.core.metrics import route_template
+
+profile_logger = logging.getLogger(SQL_PROFILE_LOGGER)
+
+# Bound parameters in each DBAPI's style (psycopg2, asyncpg, sqlite), then
+# literals, then IN lists whose length depends on the data
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+SAMPLE_STATEMENT_LENGTH = 300
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode by the statement that takes a request past its budget."""
+
+def normalize_statement(statement: str) -> str:
+    normalized = _PLACEHOLDER.sub("?", statement)
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+def fingerprint(statement: str) -> str:
+    """Statements differing only in parameters and literals share a fingerprint."""
+    return hashlib.sha1(normalize_statement(statement).encode(), usedforsecurity=False).hexdigest()[:12]
+
+class StatementStats:
+    __slots__ = ("count", "seconds", "sample")
+
+    def __init__(self, sample: str):
+        self.count = 0
+        self.seconds = 0.0
+        self.sample = sample
+
+class QueryProfile:
+    """Statements executed while handling one request, grouped by fingerprint."""
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def before_statement(self):
+        if settings.SQL_PROFILER_STRICT and self.budget is not None and self.count >= self.budget:
+            raise QueryBudgetExceeded(f"Query budget of {self.budget} exceeded")
+
+    def record(self, statement: str, seconds: float):
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats(statement[:SAMPLE_STATEMENT_LENGTH])
+        stats.count += 1
+        stats.seconds += seconds
+        self.count += 1
+        self.seconds += seconds
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def repeated(self, threshold: Optional[int] = None) -> List[dict]:
+        """Statement shapes run at least `threshold` times: the usual N+1 signature."""
+        threshold = threshold or settings.SQL_PROFILER_REPEAT_THRESHOLD
+        return [
+            {"fingerprint": key, "count": stats.count, "ms": round(stats.seconds * 1000, 2), "statement": stats.sample}
+            for key, stats in sorted(self.statements.items(), key=lambda item: -item[1].count)
+            if stats.count >= threshold
+        ]
+
+    def summary(self) -> dict:
+        return {
+            "queries": self.count,
+            "sql_ms": round(self.seconds * 1000, 2),
+            "distinct": len(self.statements),
+            "budget": self.budget,
+            "repeated": self.repeated(),
+        }
+
+profile_var: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar("query_profile", default=None)
+
+def instrument_query_profiler(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = profile_var.get()
+        if profile is not None:
+            profile.before_statement()
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+        profile = profile_var.get()
+        if profile is not None:
+            profile.record(statement, elapsed)
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring how many statements the route may issue:
+
+        @router.get("/{id}", dependencies=[Depends(query_budget(2))])
+
+    Only checked while the profiler is enabled.
+    """
+    async def declare_query_budget():
+        profile = profile_var.get()
+        if profile is not None:
+            profile.budget = max_queries
+    return declare_query_budget
+
+@contextmanager
+def profile_queries(budget: Optional[int] = None):
+    """Profile the statements run inside the block, e.g. from a script or test."""
+    profile = QueryProfile(budget)
+    token = profile_var.set(profile)
+    try:
+        yield profile
+    finally:
+        profile_var.reset(token)
+    if profile.over_budget:
+        raise QueryBudgetExceeded(f"{profile.count} queries run, budget is {profile.budget}")
+
+class SQLProfilerMiddleware:
+    """
+    Pure ASGI middleware giving each request a QueryProfile. Adds X-SQL-*
+    summary headers and logs one JSON record per request that ran SQL.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = profile_var.set(profile)
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                # Statements run after this point (streaming, background tasks) are only logged
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Queries"] = str(profile.count)
+                headers["X-SQL-Time"] = f"{profile.seconds * 1000:.2f}"
+                headers["X-SQL-Repeated"] = str(len(profile.repeated()))
+                if profile.budget is not None:
+                    headers["X-SQL-Budget"] = str(profile.budget)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            profile_var.reset(token)
+            if profile.count:
+                summary = profile.summary()
+                flagged = profile.over_budget or summary["repeated"]
+                profile_logger.log(
+                    logging.WARNING if flagged else logging.INFO,
+                    "sql profile",
+                    extra={"fields": {"method": scope["method"], "route": route_template(scope), **summary}}
+                )
@@ -0,0 +1,22 @@
+from fastapi import Request
+from app.core.config import settings
+
+def client_ip(request: Request) -> str:
+    """
+    The client's address as seen by the outermost trusted proxy.
+
+    Behind a proxy the socket peer is the proxy itself, so per-IP throttles
+    keyed on it would put every client in one bucket. Each trusted proxy
+    appends the address it received from to X-Forwarded-For; the entry
+    TRUSTED_PROXY_HOPS from the right is the real client. Entries further
+    left are client-supplied and never trusted.
+    """
+    peer = request.client.host if request.client else "unknown"
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops <= 0 or not forwarded:
+        return peer
+    addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+    if len(addresses) < hops:
+        return peer
+    return addresses[-hops]
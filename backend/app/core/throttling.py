@@ -0,0 +1,145 @@
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Optional
+from app.core.config import settings
+
+class SlidingWindowStore(ABC):
+    """
+    Counter store for sliding-window rate limits. `hit` records one event for
+    `key` and returns how many events fall inside the trailing window;
+    `count` returns the same number without recording anything.
+    """
+
+    @abstractmethod
+    def hit(self, key: str, window_seconds: float) -> int:
+        ...
+
+    @abstractmethod
+    def count(self, key: str, window_seconds: float) -> int:
+        ...
+
+    @abstractmethod
+    def reset(self, key: str):
+        ...
+
+class InMemorySlidingWindowStore(SlidingWindowStore):
+    """Per-process store. Tracks at most `max_keys` keys, evicting the least recently hit."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._events: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key: str, window_seconds: float, now: float) -> deque:
+        events = self._events.get(key)
+        if events is None:
+            return deque()
+        cutoff = now - window_seconds
+        while events and events[0] <= cutoff:
+            events.popleft()
+        if not events:
+            del self._events[key]
+        return events
+
+    def hit(self, key: str, window_seconds: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, window_seconds, now)
+            events.append(now)
+            self._events[key] = events
+            self._events.move_to_end(key)
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+            return len(events)
+
+    def count(self, key: str, window_seconds: float) -> int:
+        with self._lock:
+            return len(self._prune(key, window_seconds, time.monotonic()))
+
+    def reset(self, key: str):
+        with self._lock:
+            self._events.pop(key, None)
+
+class RedisSlidingWindowStore(SlidingWindowStore):
+    """
+    Shared store on any redis-py compatible client (one sorted set per key),
+    so limits hold across all gunicorn workers.
+    """
+
+    def __init__(self, client, prefix: str = "throttle:"):
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key: str, window_seconds: float) -> int:
+        now = time.time()
+        name = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(name, 0, now - window_seconds)
+        pipe.zadd(name, {f"{now}:{uuid.uuid4().hex}": now})
+        pipe.zcard(name)
+        pipe.expire(name, int(window_seconds) + 1)
+        return int(pipe.execute()[2])
+
+    def count(self, key: str, window_seconds: float) -> int:
+        now = time.time()
+        name = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(name, 0, now - window_seconds)
+        pipe.zcard(name)
+        return int(pipe.execute()[1])
+
+    def reset(self, key: str):
+        self.client.delete(self.prefix + key)
+
+def create_throttle_store() -> SlidingWindowStore:
+    if settings.THROTTLE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("THROTTLE_BACKEND=redis requires the 'redis' package")
+        if not settings.REDIS_URL:
+            raise RuntimeError("THROTTLE_BACKEND=redis requires REDIS_URL")
+        return RedisSlidingWindowStore(redis.Redis.from_url(settings.REDIS_URL))
+    return InMemorySlidingWindowStore()
+
+class ThrottleMetrics:
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+class Throttle:
+    """A named limit of `limit` recorded events per key within `window_seconds`."""
+
+    def __init__(self, store: SlidingWindowStore, name: str, limit: int, window_seconds: float):
+        self.store = store
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def is_limited(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        return self.store.count(self._key(key), self.window_seconds) >= self.limit
+
+    def hit(self, key: Optional[str]) -> int:
+        if not key:
+            return 0
+        return self.store.hit(self._key(key), self.window_seconds)
+
+    def reset(self, key: Optional[str]):
+        if key:
+            self.store.reset(self._key(key))
@@ -3,7 +3,9 @@ from app.shared.models.user import User # noqa
 from app.shared.models.role import Role # noqa
 from app.shared.models.school import School # noqa
 from app.modules.academics.models import AcademicYear, Term, ClassRoom, Stream # noqa
-from app.modules.evoucher.models import EVoucher, VoucherAttemptLog # noqa
+from app.modules.evoucher.models import EVoucher, VoucherAttemptLog, VoucherBatchJob # noqa
 from app.modules.students.models import Student, Guardian, StudentMedical, StudentAccount # noqa
-from app.modules.admissions.models import Admission # noqa
+from app.modules.admissions.models import Admission, AdmissionDraft, IndexNumberSequence # noqa
+from app.modules.media.models import MediaObject # noqa
 from app.shared.models.audit import AuditLog # noqa
+from app.shared.models.idempotency import IdempotencyKey # noqa
@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolMetrics:
+    """
+    Counters for one connection pool in this worker process. Pools are per
+    process, so each gunicorn worker reports its own numbers.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.peak_checked_out = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, overflow: int):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_checkout(self, checked_out: int):
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_overflow": self.peak_overflow,
+                "peak_checked_out": self.peak_checked_out,
+                "timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+# Keyed by pool logging name, which survives Pool.recreate() on engine.dispose()
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    if name not in _pool_metrics:
+        _pool_metrics[name] = PoolMetrics(name)
+    return _pool_metrics[name]
+
+class _TimedCheckoutMixin:
+    """Times how long a checkout waits for a free (or new) connection."""
+
+    def _do_get(self):
+        metrics = get_pool_metrics(self._orig_logging_name)
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_wait(time.perf_counter() - started, self.overflow())
+        return conn
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+# SQLAlchemy names pool loggers after the pool class, which puts these under
+# the INFO-level "app" logger; keep them as quiet as its own pool loggers.
+for _pool_class in (InstrumentedQueuePool, InstrumentedAsyncQueuePool):
+    logging.getLogger(f"{_pool_class.__module__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
+def instrument_engine(engine: Engine, name: str):
+    """Count connects, checkouts, checkins and invalidations on `engine`'s pool."""
+    metrics = get_pool_metrics(name)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout(engine.pool.checkedout())
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.incr("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+def pool_status(engine: Engine, name: str) -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    status.update(get_pool_metrics(name).snapshot())
+    return status
+
+def pool_report(engines: Dict[str, Engine]) -> dict:
+    pools = {name: pool_status(engine, name) for name, engine in engines.items()}
+    return {
+        "pid": os.getpid(),
+        # Upper bound this worker can open; multiply by the worker count for Postgres max_connections
+        "max_connections": sum(p.get("pool_size", 0) + max(p.get("max_overflow", 0), 0) for p in pools.values()),
+        "pools": pools,
+    }
@@ -1,13 +1,59 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_query_metrics
+from app.core.profiling import instrument_query_profiler
+from .pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
-engine = create_engine(settings.sqlalchemy_database_uri, pool_pre_ping=True)
+def _engine_options(uri: str, poolclass, logging_name: str, is_async: bool = False) -> dict:
+    options = {"pool_pre_ping": True, "poolclass": poolclass, "pool_logging_name": logging_name}
+    if uri.startswith("sqlite"):
+        # SQLite files keep SQLAlchemy's own pool defaults
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and uri.startswith("postgresql"):
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+engine = create_engine(
+    settings.sqlalchemy_database_uri,
+    **_engine_options(settings.sqlalchemy_database_uri, InstrumentedQueuePool, "sync")
+)
+instrument_engine(engine, "sync")
+instrument_query_metrics(engine)
+if settings.SQL_PROFILER_ENABLED:
+    instrument_query_profiler(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for `async def` endpoints. Relationships are not lazy-loadable
+# on an AsyncSession, so queries run through it must eager-load what they use.
+async_engine = create_async_engine(
+    settings.async_database_uri,
+    **_engine_options(settings.async_database_uri, InstrumentedAsyncQueuePool, "async", is_async=True)
+)
+instrument_engine(async_engine.sync_engine, "async")
+instrument_query_metrics(async_engine.sync_engine)
+if settings.SQL_PROFILER_ENABLED:
+    instrument_query_profiler(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
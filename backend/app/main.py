@@ -1,24 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 import logging
 import traceback
 from app.core import logging_config # noqa
 from app.core.config import settings
 from app.db import base # noqa
-from app.db.session import get_db
+from app.db.pool import pool_report
+from app.db.session import async_engine, engine, get_db
 from app.api import api_router
+from app.core.metrics import MetricsMiddleware, render_metrics
 from app.core.middleware import LoggingMiddleware
+from app.core.profiling import SQLProfilerMiddleware
+from app.core.executors import shutdown_executors
+from app.modules.evoucher.attempt_log import attempt_log_writer
+from app.modules.evoucher.sweeper import voucher_sweeper
+from app.modules.media.serving import router as media_serving_router
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    attempt_log_writer.start()
+    if settings.VOUCHER_SWEEP_ENABLED:
+        voucher_sweeper.start()
+    yield
+    await voucher_sweeper.stop()
+    attempt_log_writer.stop()
+    shutdown_executors()
+    await async_engine.dispose()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=settings.openapi_url,
     docs_url=settings.docs_url,
     redoc_url=settings.redoc_url,
+    lifespan=lifespan,
 )
 
 # Global Exception Handler
@@ -43,8 +62,13 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal Server Error"},
     )
 
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+
 # Register centralized logging middleware
 app.add_middleware(LoggingMiddleware)
+# Added after logging so it wraps it and times the whole stack
+app.add_middleware(MetricsMiddleware)
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -62,11 +86,11 @@ app.add_middleware(
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Mount static files for media
+# Media files, with ETag / immutable caching and Range support
 uploads_path = os.path.join(os.getcwd(), settings.UPLOAD_DIR)
 if not os.path.exists(uploads_path):
     os.makedirs(uploads_path)
-app.mount(settings.MEDIA_URL, StaticFiles(directory=uploads_path), name="media")
+app.include_router(media_serving_router, prefix=settings.MEDIA_URL)
 
 @app.get("/")
 def root():
@@ -76,6 +100,18 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+if settings.DB_POOL_REPORT_ENABLED:
+    @app.get("/health/db-pool", include_in_schema=False)
+    def db_pool_health():
+        # Numbers are for the worker that serves the request
+        return pool_report({"sync": engine, "async": async_engine.sync_engine})
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text format; summed over all gunicorn workers in multiprocess mode
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=settings.PORT)
@@ -62,7 +62,8 @@ class ClassRoom(Base):
     name = Column(String, unique=True, index=True) # e.g. JHS 1, Primary 1
     level = Column(String, nullable=False) # e.g. JHS, Primary
     
-    admissions = relationship("Admission", back_populates="class_room")
+    # Deletes are refused while admissions exist, so never load them just to unlink
+    admissions = relationship("Admission", back_populates="class_room", passive_deletes=True)
     streams = relationship("Stream", back_populates="class_room")
 
 class Stream(Base):
@@ -71,4 +72,4 @@ class Stream(Base):
     name = Column(String, nullable=False) # e.g. A, B, Gold, Blue
     
     class_room = relationship("ClassRoom", back_populates="streams")
-    admissions = relationship("Admission", back_populates="stream")
+    admissions = relationship("Admission", back_populates="stream", passive_deletes=True)
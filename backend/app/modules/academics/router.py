@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
 import logging
+from app.core.profiling import query_budget
 from app.db.session import get_db
+from app.modules.admissions.models import Admission
 from . import schemas, models
 from app.modules.evoucher.models import EVoucher
 
@@ -365,7 +368,7 @@ def update_class(
         logger.exception(f"Failed to update class {class_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.delete("/classes/{class_id}")
+@router.delete("/classes/{class_id}", dependencies=[Depends(query_budget(4))])
 def delete_class(
     class_id: int,
     db: Session = Depends(get_db)
@@ -375,8 +378,8 @@ def delete_class(
         if not db_obj:
             raise HTTPException(status_code=404, detail="Class not found")
         
-        # Check for dependent admissions
-        if db_obj.admissions:
+        # Check for dependent admissions without loading them
+        if db.query(exists().where(Admission.class_id == class_id)).scalar():
             raise HTTPException(status_code=400, detail="Cannot delete class with existing admissions. Archive it instead.")
         
         db.delete(db_obj)
@@ -412,7 +415,7 @@ def update_stream(
         logger.exception(f"Failed to update stream {stream_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.delete("/streams/{stream_id}")
+@router.delete("/streams/{stream_id}", dependencies=[Depends(query_budget(3))])
 def delete_stream(
     stream_id: int,
     db: Session = Depends(get_db)
@@ -422,8 +425,8 @@ def delete_stream(
         if not db_obj:
             raise HTTPException(status_code=404, detail="Stream not found")
         
-        # Check for dependent admissions
-        if db_obj.admissions:
+        # Check for dependent admissions without loading them
+        if db.query(exists().where(Admission.stream_id == stream_id)).scalar():
             raise HTTPException(status_code=400, detail="Cannot delete stream with existing admissions.")
         
         db.delete(db_obj)
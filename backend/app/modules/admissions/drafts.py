@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .models import AdmissionDraft
+from .schemas import AdmissionDraftResponse, AdmissionDraftStatus, AdmissionPlacement
+from ..academics.models import ClassRoom, Stream, Term
+from ..evoucher.models import EVoucher, VoucherStatus
+from ..evoucher.service import RESERVATION_TTL_MINUTES
+
+# Wizard steps in order; medical is optional
+DRAFT_STEPS = ("student", "guardians", "medical", "placement")
+REQUIRED_STEPS = ("student", "guardians", "placement")
+
+class AdmissionDraftService:
+    """
+    Server-side wizard state. Each step is validated and saved on its own, so
+    a correction resends one step, and the final submit only commits what
+    has already been checked.
+    """
+
+    @staticmethod
+    def _reserved_voucher(db: Session, session_token: str) -> Tuple[EVoucher, datetime]:
+        voucher = db.execute(
+            select(EVoucher).where(EVoucher.reserved_session_id == session_token)
+        ).scalar_one_or_none()
+        if not voucher or voucher.status != VoucherStatus.Reserved:
+            raise HTTPException(status_code=400, detail="Invalid or expired voucher session")
+        expires_at = voucher.reserved_at + timedelta(minutes=RESERVATION_TTL_MINUTES)
+        if expires_at < datetime.utcnow():
+            raise HTTPException(status_code=400, detail="Invalid or expired voucher session")
+        return voucher, expires_at
+
+    @staticmethod
+    def _find(db: Session, voucher_id: int, for_update: bool = False) -> Optional[AdmissionDraft]:
+        stmt = select(AdmissionDraft).where(AdmissionDraft.voucher_id == voucher_id)
+        if for_update:
+            stmt = stmt.with_for_update()
+        return db.execute(stmt).scalar_one_or_none()
+
+    @staticmethod
+    def _live_data(draft: Optional[AdmissionDraft]) -> dict:
+        # A draft outliving its reservation belongs to an abandoned session
+        if draft is None or draft.expires_at < datetime.utcnow():
+            return {}
+        return draft.data
+
+    @staticmethod
+    def _status(data: dict, expires_at: datetime) -> dict:
+        return {
+            "completed_steps": [step for step in DRAFT_STEPS if step in data],
+            "missing_steps": [step for step in REQUIRED_STEPS if step not in data],
+            "expires_at": expires_at,
+        }
+
+    @staticmethod
+    def validate_placement(db: Session, voucher: EVoucher, placement: AdmissionPlacement):
+        if placement.academic_year_id != voucher.academic_year_id:
+            raise HTTPException(status_code=400, detail="Academic year mismatch for this voucher")
+        # One round trip for all three references
+        class_id, stream_class_id, term_year_id = db.execute(select(
+            select(ClassRoom.id).where(ClassRoom.id == placement.class_id).scalar_subquery(),
+            select(Stream.class_id).where(Stream.id == placement.stream_id).scalar_subquery(),
+            select(Term.academic_year_id).where(Term.id == placement.term_id).scalar_subquery(),
+        )).one()
+        if class_id is None:
+            raise HTTPException(status_code=400, detail="Class not found")
+        if placement.stream_id is not None and stream_class_id != placement.class_id:
+            raise HTTPException(status_code=400, detail="Stream does not belong to the selected class")
+        if term_year_id != placement.academic_year_id:
+            raise HTTPException(status_code=400, detail="Term does not belong to the selected academic year")
+
+    @staticmethod
+    def save_step(db: Session, session_token: str, step: str, payload: BaseModel) -> AdmissionDraftStatus:
+        voucher, expires_at = AdmissionDraftService._reserved_voucher(db, session_token)
+        if step == "placement":
+            AdmissionDraftService.validate_placement(db, voucher, payload)
+
+        # Compact: no nulls, JSON-native values
+        value = payload.model_dump(mode="json", exclude_none=True)
+        if step == "guardians":
+            value = value["guardians"]
+
+        draft = AdmissionDraftService._find(db, voucher.id, for_update=True)
+        data = AdmissionDraftService._live_data(draft)
+        if draft is None:
+            draft = AdmissionDraft(voucher_id=voucher.id)
+            db.add(draft)
+        # Reassigned, not mutated, so the JSON column is marked dirty
+        draft.data = {**data, step: value}
+        draft.expires_at = expires_at
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another step's first save created the draft concurrently; merge into it
+            db.rollback()
+            return AdmissionDraftService.save_step(db, session_token, step, payload)
+        return AdmissionDraftService._status(draft.data, expires_at)
+
+    @staticmethod
+    def get_draft(db: Session, session_token: str) -> AdmissionDraftResponse:
+        voucher, expires_at = AdmissionDraftService._reserved_voucher(db, session_token)
+        data = AdmissionDraftService._live_data(AdmissionDraftService._find(db, voucher.id))
+        return AdmissionDraftResponse(**data, **AdmissionDraftService._status(data, expires_at))
+
+    @staticmethod
+    def load_for_submit(db: Session, session_token: str) -> AdmissionDraftResponse:
+        """The saved steps, revalidated into their schemas; 400 if a required step is missing."""
+        voucher, expires_at = AdmissionDraftService._reserved_voucher(db, session_token)
+        data = AdmissionDraftService._live_data(AdmissionDraftService._find(db, voucher.id))
+        status = AdmissionDraftService._status(data, expires_at)
+        if status["missing_steps"]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Admission draft is incomplete: missing {', '.join(status['missing_steps'])}"
+            )
+        return AdmissionDraftResponse(**data, **status)
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Delete drafts whose reservation has lapsed; the caller commits."""
+        return db.execute(
+            delete(AdmissionDraft).where(AdmissionDraft.expires_at < datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
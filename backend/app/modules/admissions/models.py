@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Index, JSON, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
 from typing import Optional
@@ -39,6 +40,16 @@ class Admission(Base):
     term = relationship("Term")
     voucher = relationship("EVoucher")
 
+    __table_args__ = (
+        # Newest-first keyset pagination for the admissions dashboard
+        Index("ix_admission_created_at_id", "created_at", "id"),
+        # One live admission per voucher; a rejection frees the voucher again
+        Index(
+            "uq_admission_voucher_id_active", "voucher_id", unique=True,
+            postgresql_where=text("status != 'Rejected'"), sqlite_where=text("status != 'Rejected'")
+        ),
+    )
+
     @property
     def student_name(self) -> str:
         if self.student:
@@ -71,3 +82,26 @@ class Admission(Base):
     @property
     def student_index_number(self) -> Optional[str]:
         return self.student.index_number if self.student else None
+
+class IndexNumberSequence(Base):
+    """Last issued index number sequence per academic year and level."""
+    id = Column(Integer, primary_key=True, index=True)
+    academic_year_id = Column(Integer, ForeignKey("academicyear.id"), nullable=False)
+    level_code = Column(String, nullable=False) # e.g. JHS, PRI
+    last_value = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("academic_year_id", "level_code", name="uq_indexnumbersequence_year_level"),
+    )
+
+class AdmissionDraft(Base):
+    """
+    Wizard steps saved so far for a reserved voucher, one JSON object per
+    step. Lives as long as the voucher reservation; the sweeper purges it.
+    """
+    id = Column(Integer, primary_key=True)
+    voucher_id = Column(Integer, ForeignKey("evoucher.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
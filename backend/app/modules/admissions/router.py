@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, selectinload, aliased
-from typing import List, Optional
-from app.db.session import get_db
+from datetime import timedelta
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.idempotency import IdempotencyService, request_fingerprint
+from app.core.profiling import query_budget
+from app.db.session import get_async_db, get_db
 from . import schemas, service, models
+from .drafts import AdmissionDraftService
+from ..students.schemas import StudentCreate, StudentMedicalCreate
 from .models import Admission, AdmissionStatus
-from app.modules.students.models import Student
-from app.modules.evoucher.models import EVoucher
-from datetime import datetime
 import logging
 import traceback
 import sys
@@ -17,24 +22,162 @@ logger = logging.getLogger(__name__)
 @router.post("/", response_model=schemas.AdmissionResponse)
 def create_admission(
     obj_in: schemas.AdmissionWizardSubmit,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Step 2-3 of Wizard: Capture all data and create a PENDING admission.
+    Retries with the same Idempotency-Key (by default, the same voucher
+    session) get the original response back instead of a second intake.
     """
-    try:
-        return service.AdmissionsService.create_pending_admission(
-            db,
-            voucher_session_token=obj_in.voucher_session_token,
-            student_data=obj_in.student.model_dump(),
-            guardian_data=[g.model_dump() for g in obj_in.guardians],
-            medical_data=obj_in.medical.model_dump() if obj_in.medical else None,
-            placement_data=obj_in.placement
+    key, request_hash = _idempotency(obj_in.voucher_session_token, idempotency_key, obj_in)
+    return _submit_admission(db, key, request_hash, lambda: {
+        "voucher_session_token": obj_in.voucher_session_token,
+        "student_data": obj_in.student.model_dump(),
+        "guardian_data": [g.model_dump() for g in obj_in.guardians],
+        "medical_data": obj_in.medical.model_dump() if obj_in.medical else None,
+        "placement_data": obj_in.placement,
+    })
+
+def _idempotency(session_token: str, idempotency_key: Optional[str], payload) -> Tuple[str, str]:
+    """
+    Storage key and fingerprint for a submit. Without an Idempotency-Key the
+    voucher session is the key: it only ever yields one admission, so any
+    retry under it, through either submit route, replays the first response.
+    """
+    if idempotency_key is None:
+        return (
+            IdempotencyService.storage_key("admissions.create", session_token),
+            request_fingerprint({"voucher_session_token": session_token})
         )
+    return IdempotencyService.storage_key("admissions.create", idempotency_key), request_fingerprint(payload)
+
+def _submit_admission(db: Session, key: str, request_hash: str, build_intake: Callable[[], dict]):
+    """
+    Run intake once per idempotency key; retries get the first response.
+    `build_intake` returns create_pending_admission's arguments and is only
+    called once the key is claimed.
+    """
+    claim = IdempotencyService.claim(
+        db, key, request_hash, ttl=timedelta(minutes=settings.ADMISSION_IDEMPOTENCY_TTL_MINUTES)
+    )
+    if claim.replay is not None:
+        return claim.replay
+
+    try:
+        admission = service.AdmissionsService.create_pending_admission(db, **build_intake())
+    except Exception as e:
+        IdempotencyService.release(db, claim)
+        if isinstance(e, HTTPException):
+            raise
+        logger.exception("Failed to create pending admission")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response = schemas.AdmissionResponse.model_validate(admission)
+    # The temp password stays valid after activation; never keep it at rest
+    IdempotencyService.complete(db, claim, 200, response.model_copy(
+        update={"temp_password": None, "temp_password_withheld": True}
+    ))
+    return response
+
+@router.get("/drafts/{session_token}", response_model=schemas.AdmissionDraftResponse)
+def get_admission_draft(
+    session_token: str,
+    db: Session = Depends(get_db)
+):
+    """Wizard steps saved so far, to resume after a reload."""
+    return AdmissionDraftService.get_draft(db, session_token)
+
+@router.patch("/drafts/{session_token}/student", response_model=schemas.AdmissionDraftStatus)
+def save_draft_student(
+    session_token: str,
+    obj_in: StudentCreate,
+    db: Session = Depends(get_db)
+):
+    return AdmissionDraftService.save_step(db, session_token, "student", obj_in)
+
+@router.patch("/drafts/{session_token}/guardians", response_model=schemas.AdmissionDraftStatus)
+def save_draft_guardians(
+    session_token: str,
+    obj_in: schemas.AdmissionDraftGuardians,
+    db: Session = Depends(get_db)
+):
+    return AdmissionDraftService.save_step(db, session_token, "guardians", obj_in)
+
+@router.patch("/drafts/{session_token}/medical", response_model=schemas.AdmissionDraftStatus)
+def save_draft_medical(
+    session_token: str,
+    obj_in: StudentMedicalCreate,
+    db: Session = Depends(get_db)
+):
+    return AdmissionDraftService.save_step(db, session_token, "medical", obj_in)
+
+@router.patch("/drafts/{session_token}/placement", response_model=schemas.AdmissionDraftStatus)
+def save_draft_placement(
+    session_token: str,
+    obj_in: schemas.AdmissionPlacement,
+    db: Session = Depends(get_db)
+):
+    return AdmissionDraftService.save_step(db, session_token, "placement", obj_in)
+
+@router.post("/drafts/{session_token}/submit", response_model=schemas.AdmissionResponse)
+def submit_admission_draft(
+    session_token: str,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Create the PENDING admission from the saved, already validated steps.
+    Without an Idempotency-Key, a retry through this route or POST / returns
+    the first response.
+    """
+    key, request_hash = _idempotency(session_token, idempotency_key, {"voucher_session_token": session_token})
+
+    def build_intake() -> dict:
+        draft = AdmissionDraftService.load_for_submit(db, session_token)
+        return {
+            "voucher_session_token": session_token,
+            "student_data": draft.student.model_dump(),
+            "guardian_data": [g.model_dump() for g in draft.guardians],
+            "medical_data": draft.medical.model_dump() if draft.medical else None,
+            "placement_data": draft.placement.model_dump(),
+        }
+
+    return _submit_admission(db, key, request_hash, build_intake)
+
+@router.post("/bulk-approve", response_model=schemas.AdmissionBulkResponse)
+def bulk_approve_admissions(
+    obj_in: schemas.AdmissionBulkAction,
+    admin_id: int = 1, # TODO: Get from auth token
+    db: Session = Depends(get_db)
+):
+    """
+    Approve many admissions at once. Each id gets its own outcome; the
+    approvable ones are committed together.
+    """
+    try:
+        return service.AdmissionsService.bulk_approve_admissions(db, obj_in.admission_ids, admin_id)
     except HTTPException:
         raise
     except Exception as e:
-        logger.exception("Failed to create pending admission")
+        logger.exception("Failed to bulk approve admissions")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/bulk-reject", response_model=schemas.AdmissionBulkResponse)
+def bulk_reject_admissions(
+    obj_in: schemas.AdmissionBulkAction,
+    admin_id: int = 1, # TODO: Get from auth token
+    db: Session = Depends(get_db)
+):
+    """
+    Reject many pending admissions at once.
+    """
+    try:
+        return service.AdmissionsService.bulk_reject_admissions(db, obj_in.admission_ids, admin_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to bulk reject admissions")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{admission_id}/approve", response_model=schemas.AdmissionResponse)
@@ -54,57 +197,39 @@ def approve_admission(
         logger.exception(f"Failed to approve admission {admission_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[schemas.AdmissionResponse])
-def list_admissions(
+@router.get("/", response_model=schemas.PaginatedAdmissionResponse)
+async def list_admissions(
     status: Optional[str] = Query(None),
     class_id: int = Query(None),
     academic_year_id: int = Query(None),
     term_id: int = Query(None),
     search: str = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
+    enum_status = None
+    if status:
+        try:
+            # Case-insensitive: AdmissionStatus._missing_ matches 'REJECTED' to 'Rejected'
+            enum_status = AdmissionStatus(status)
+        except ValueError:
+            # Invalid status string provided (not Pending, Approved, Rejected)
+            return {"items": [], "next_cursor": None, "size": size}
+
     try:
-        # Using an alias 'adm' and selectinload is the SAFEST way to avoid 
-        # AmbiguousColumn errors when filtering by common names like 'status'
-        adm = aliased(Admission, name='adm')
-        
-        query = db.query(adm).options(
-            selectinload(adm.student),
-            selectinload(adm.voucher),
-            selectinload(adm.class_room),
-            selectinload(adm.academic_year),
-            selectinload(adm.term),
-            selectinload(adm.stream)
+        return await service.AdmissionsService.list_admissions(
+            db,
+            status=enum_status,
+            class_id=class_id,
+            academic_year_id=academic_year_id,
+            term_id=term_id,
+            search=search,
+            cursor=cursor,
+            size=size
         )
-        
-        if status:
-            try:
-                # Handle case-insensitive status. Frontend sends 'Rejected', but DB now requires 'REJECTED'.
-                # We convert input to uppercase to match the AdmissionStatus Enum members.
-                status_upper = status.upper()
-                enum_status = AdmissionStatus(status_upper)
-                query = query.filter(adm.status == enum_status)
-            except ValueError:
-                # Invalid status string provided (not in PENDING, APPROVED, REJECTED)
-                return []
-            
-        if class_id:
-            query = query.filter(adm.class_id == class_id)
-        if academic_year_id:
-            query = query.filter(adm.academic_year_id == academic_year_id)
-        if term_id:
-            query = query.filter(adm.term_id == term_id)
-        
-        if search:
-            search_filter = f"%{search}%"
-            # Join required for filtering by student name or voucher number
-            query = query.join(adm.student).join(adm.voucher).filter(
-                (Student.first_name.ilike(search_filter)) |
-                (Student.last_name.ilike(search_filter)) |
-                (EVoucher.voucher_number.ilike(search_filter))
-            )
-        
-        return query.order_by(adm.created_at.desc()).all()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Failed to list admissions")
         raise HTTPException(status_code=500, detail=str(e))
@@ -126,13 +251,13 @@ def reject_admission(
         logger.exception(f"Failed to reject admission {admission_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{admission_id}", response_model=schemas.AdmissionResponse)
+@router.get("/{admission_id}", response_model=schemas.AdmissionResponse, dependencies=[Depends(query_budget(1))])
 def get_admission(
     admission_id: int,
     db: Session = Depends(get_db)
 ):
     try:
-        admission = db.query(Admission).filter(Admission.id == admission_id).first()
+        admission = service.AdmissionsService.get_admission(db, admission_id)
         if not admission:
             raise HTTPException(status_code=404, detail="Admission not found")
         return admission
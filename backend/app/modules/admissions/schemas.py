@@ -1,6 +1,7 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from typing import Optional, List
+from app.core.constants import MAX_BULK_ADMISSIONS
 from .models import AdmissionStatus
 from ..students.schemas import StudentCreate, GuardianCreate, StudentMedicalCreate
 
@@ -30,6 +31,26 @@ class AdmissionWizardSubmit(BaseModel):
     medical: Optional[StudentMedicalCreate] = None
     placement: dict # {academic_year_id, class_id, stream_id, term_id}
 
+class AdmissionPlacement(BaseModel):
+    academic_year_id: int
+    class_id: int
+    stream_id: Optional[int] = None
+    term_id: int
+
+class AdmissionDraftGuardians(BaseModel):
+    guardians: List[GuardianCreate] = Field(..., min_length=1)
+
+class AdmissionDraftStatus(BaseModel):
+    completed_steps: List[str]
+    missing_steps: List[str]
+    expires_at: datetime
+
+class AdmissionDraftResponse(AdmissionDraftStatus):
+    student: Optional[StudentCreate] = None
+    guardians: Optional[List[GuardianCreate]] = None
+    medical: Optional[StudentMedicalCreate] = None
+    placement: Optional[AdmissionPlacement] = None
+
 class AdmissionUpdate(BaseModel):
     class_id: Optional[int] = None
     stream_id: Optional[int] = None
@@ -55,7 +76,46 @@ class AdmissionResponse(AdmissionBase):
     approved_at: Optional[datetime] = None
     created_at: datetime
     temp_password: Optional[str] = None
+    # Set on idempotent replays, which never carry the one-time password:
+    # the student's password has to be reset instead
+    temp_password_withheld: bool = False
     student_index_number: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+class AdmissionListItem(BaseModel):
+    id: int
+    student_id: int
+    student_name: str
+    student_index_number: Optional[str] = None
+    voucher_number: str
+    academic_year_id: int
+    academic_year_name: str
+    class_id: int
+    class_name: str
+    stream_id: Optional[int] = None
+    term_id: int
+    term_name: str
+    status: AdmissionStatus
+    created_at: datetime
+
+class PaginatedAdmissionResponse(BaseModel):
+    items: List[AdmissionListItem]
+    next_cursor: Optional[str] = None
+    size: int
+
+class AdmissionBulkAction(BaseModel):
+    admission_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ADMISSIONS)
+
+class AdmissionBulkItemResult(BaseModel):
+    admission_id: int
+    success: bool
+    status: Optional[AdmissionStatus] = None
+    student_index_number: Optional[str] = None
+    detail: Optional[str] = None
+
+class AdmissionBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[AdmissionBulkItemResult]
@@ -1,20 +1,215 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, exists, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
 import secrets
 import string
 
-from .models import Admission, AdmissionStatus
+from .models import Admission, AdmissionDraft, AdmissionStatus, IndexNumberSequence
 from ..evoucher.models import EVoucher, VoucherStatus
 from ..students.models import Student, Guardian, StudentMedical, StudentAccount, Gender
-from ..academics.models import AcademicYear, ClassRoom, Stream
+from ..students.service import StudentService
+from ..academics.models import AcademicYear, ClassRoom, Stream, Term
 from app.shared.models.audit import AuditLog
+from app.core.executors import submit_to_process_pool
 from app.core.security import get_password_hash
+from app.core.pagination import decode_cursor, encode_cursor, escape_like
 import traceback
 import sys
 
+class IndexNumberAllocator:
+    """
+    Issues index number sequences from a per (academic year, level) counter
+    row. The increment is a single UPDATE, so the row stays locked until the
+    caller's transaction commits and concurrent approvals in other workers
+    queue behind it instead of reading the same value.
+    """
+
+    @staticmethod
+    def allocate(db: Session, academic_year_id: int, level_code: str, count: int = 1) -> int:
+        """Reserve `count` consecutive sequence values and return the first."""
+        counter = (
+            IndexNumberSequence.academic_year_id == academic_year_id,
+            IndexNumberSequence.level_code == level_code
+        )
+        stmt = update(IndexNumberSequence).where(*counter).values(
+            last_value=IndexNumberSequence.last_value + count
+        ).execution_options(synchronize_session=False)
+
+        for _ in range(2):
+            if db.get_bind().dialect.update_returning:
+                last_value = db.execute(stmt.returning(IndexNumberSequence.last_value)).scalar()
+            else:
+                seq = db.query(IndexNumberSequence).filter(*counter).with_for_update().first()
+                last_value = None
+                if seq:
+                    seq.last_value += count
+                    db.flush()
+                    last_value = seq.last_value
+            if last_value is not None:
+                return last_value - count + 1
+
+            # First allocation for this year/level: create the counter, tolerating a concurrent creator
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                db.execute(pg_insert(IndexNumberSequence).values(
+                    academic_year_id=academic_year_id, level_code=level_code, last_value=0
+                ).on_conflict_do_nothing())
+            elif dialect == "sqlite":
+                db.execute(sqlite_insert(IndexNumberSequence).values(
+                    academic_year_id=academic_year_id, level_code=level_code, last_value=0
+                ).on_conflict_do_nothing())
+            else:
+                db.add(IndexNumberSequence(academic_year_id=academic_year_id, level_code=level_code, last_value=0))
+                db.flush()
+        raise RuntimeError(f"Could not allocate index number for year {academic_year_id}/{level_code}")
+
+    @staticmethod
+    def format(level_code: str, year_short: str, seq: int) -> str:
+        return f"SCH/{level_code}/{year_short}/{seq:04d}"
+
+    @staticmethod
+    def next_index_numbers(db: Session, academic_year_id: int, level_code: str, year_short: str, count: int) -> List[str]:
+        """Allocate `count` index numbers as one block, skipping any already taken."""
+        numbers: List[str] = []
+        while len(numbers) < count:
+            needed = count - len(numbers)
+            first = IndexNumberAllocator.allocate(db, academic_year_id, level_code, needed)
+            candidates = [IndexNumberAllocator.format(level_code, year_short, seq) for seq in range(first, first + needed)]
+            # Skip values already taken, e.g. by a manually edited index number
+            taken = {
+                n for (n,) in db.query(Student.index_number).filter(Student.index_number.in_(candidates))
+            }
+            numbers.extend(n for n in candidates if n not in taken)
+        return numbers
+
+    @staticmethod
+    def next_index_number(db: Session, academic_year_id: int, level_code: str, year_short: str) -> str:
+        return IndexNumberAllocator.next_index_numbers(db, academic_year_id, level_code, year_short, 1)[0]
+
+def _full_name(first_name: str, middle_name: Optional[str], last_name: str) -> str:
+    return " ".join(p for p in (first_name, middle_name, last_name) if p)
+
 class AdmissionsService:
+    @staticmethod
+    async def list_admissions(
+        db: AsyncSession,
+        status: Optional[AdmissionStatus] = None,
+        class_id: Optional[int] = None,
+        academic_year_id: Optional[int] = None,
+        term_id: Optional[int] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        size: int = 50
+    ) -> dict:
+        """
+        Newest-first admissions for the dashboard table. Selects only the
+        displayed columns in one joined query and pages by (created_at, id).
+        """
+        query = select(
+            Admission.id,
+            Admission.student_id,
+            Admission.academic_year_id,
+            Admission.class_id,
+            Admission.stream_id,
+            Admission.term_id,
+            Admission.status,
+            Admission.created_at,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Student.index_number,
+            EVoucher.voucher_number,
+            ClassRoom.name.label("class_name"),
+            Stream.name.label("stream_name"),
+            AcademicYear.name.label("academic_year_name"),
+            Term.name.label("term_name")
+        ).join(Student, Admission.student_id == Student.id) \
+         .join(EVoucher, Admission.voucher_id == EVoucher.id) \
+         .outerjoin(ClassRoom, Admission.class_id == ClassRoom.id) \
+         .outerjoin(Stream, Admission.stream_id == Stream.id) \
+         .outerjoin(AcademicYear, Admission.academic_year_id == AcademicYear.id) \
+         .outerjoin(Term, Admission.term_id == Term.id)
+
+        if status:
+            query = query.where(Admission.status == status)
+        if class_id:
+            query = query.where(Admission.class_id == class_id)
+        if academic_year_id:
+            query = query.where(Admission.academic_year_id == academic_year_id)
+        if term_id:
+            query = query.where(Admission.term_id == term_id)
+        if search:
+            # Served by the pg_trgm GIN indexes on PostgreSQL
+            pattern = f"%{escape_like(search)}%"
+            query = query.where(or_(
+                Student.first_name.ilike(pattern, escape="\\"),
+                Student.last_name.ilike(pattern, escape="\\"),
+                EVoucher.voucher_number.ilike(pattern, escape="\\")
+            ))
+
+        after = decode_cursor(cursor, (datetime, int))
+        if after:
+            query = query.where(tuple_(Admission.created_at, Admission.id) < tuple(after))
+
+        rows = (await db.execute(
+            query.order_by(Admission.created_at.desc(), Admission.id.desc()).limit(size + 1)
+        )).all()
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id])
+
+        items = []
+        for row in rows:
+            class_name = row.class_name or "N/A"
+            if row.stream_name:
+                class_name += f" ({row.stream_name})"
+            items.append({
+                "id": row.id,
+                "student_id": row.student_id,
+                "student_name": _full_name(row.first_name, row.middle_name, row.last_name),
+                "student_index_number": row.index_number,
+                "voucher_number": row.voucher_number,
+                "academic_year_id": row.academic_year_id,
+                "academic_year_name": row.academic_year_name or "N/A",
+                "class_id": row.class_id,
+                "class_name": class_name,
+                "stream_id": row.stream_id,
+                "term_id": row.term_id,
+                "term_name": row.term_name or "N/A",
+                "status": row.status,
+                "created_at": row.created_at
+            })
+
+        return {"items": items, "next_cursor": next_cursor, "size": size}
+
+    @staticmethod
+    def get_admission(db: Session, admission_id: int) -> Optional[Admission]:
+        """Admission with everything AdmissionResponse reads, in one statement."""
+        return db.execute(
+            select(Admission).options(
+                joinedload(Admission.student),
+                joinedload(Admission.voucher),
+                joinedload(Admission.academic_year),
+                joinedload(Admission.class_room),
+                joinedload(Admission.stream),
+                joinedload(Admission.term)
+            ).where(Admission.id == admission_id)
+        ).unique().scalar_one_or_none()
+
+    @staticmethod
+    def _has_active_admission(db: Session, voucher_id: int) -> bool:
+        return db.query(exists().where(
+            Admission.voucher_id == voucher_id, Admission.status != AdmissionStatus.Rejected
+        )).scalar()
+
     @staticmethod
     def create_pending_admission(
         db: Session,
@@ -24,8 +219,16 @@ class AdmissionsService:
         medical_data: Optional[dict],
         placement_data: dict
     ) -> Admission:
-        # 1. Validate Voucher Session
-        voucher = db.query(EVoucher).filter(EVoucher.reserved_session_id == voucher_session_token).first()
+        # Hash the temporary password before the voucher row is locked, so a
+        # queue of batch hashing jobs on the pool never holds the lock open
+        temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(8))
+        password_hash = submit_to_process_pool(get_password_hash, temp_password).result()
+
+        # 1. Validate Voucher Session, locking the voucher row until commit so
+        # concurrent submits with the same session queue behind this one
+        voucher = db.execute(
+            select(EVoucher).where(EVoucher.reserved_session_id == voucher_session_token).with_for_update()
+        ).scalar_one_or_none()
         if not voucher or voucher.status != VoucherStatus.Reserved:
             raise HTTPException(status_code=400, detail="Invalid or expired voucher session")
         
@@ -33,9 +236,12 @@ class AdmissionsService:
         if voucher.academic_year_id != placement_data['academic_year_id']:
             raise HTTPException(status_code=400, detail="Academic year mismatch for this voucher")
 
+        if AdmissionsService._has_active_admission(db, voucher.id):
+            raise HTTPException(status_code=409, detail="An admission has already been submitted for this voucher")
+
         try:
             # 3. Create Student
-            student = Student(
+            student_id = db.execute(insert(Student).values(
                 first_name=student_data['first_name'],
                 middle_name=student_data.get('middle_name'),
                 last_name=student_data['last_name'],
@@ -45,84 +251,78 @@ class AdmissionsService:
                 address=student_data.get('address'),
                 city=student_data.get('city'),
                 photo=student_data.get('photo')
-            )
-            db.add(student)
-            db.flush() # Get student ID
-
-            # 4. Create Guardians
-            for g in guardian_data:
-                guardian = Guardian(
-                    student_id=student.id,
-                    name=g['name'],
-                    relationship_type=g['relationship_type'],
-                    phone=g['phone'],
-                    secondary_phone=g.get('secondary_phone'),
-                    email=g.get('email'),
-                    address=g['address'],
-                    occupation=g.get('occupation')
-                )
-                db.add(guardian)
+            ).returning(Student.id)).scalar_one()
+
+            # 4. Create Guardians, one multi-row INSERT
+            if guardian_data:
+                db.execute(insert(Guardian), [{
+                    "student_id": student_id,
+                    "name": g['name'],
+                    "relationship_type": g['relationship_type'],
+                    "phone": g['phone'],
+                    "secondary_phone": g.get('secondary_phone'),
+                    "email": g.get('email'),
+                    "address": g['address'],
+                    "occupation": g.get('occupation')
+                } for g in guardian_data])
 
             # 5. Create Medical (Optional)
             if medical_data:
-                medical = StudentMedical(
-                    student_id=student.id,
+                db.execute(insert(StudentMedical).values(
+                    student_id=student_id,
                     health_conditions=medical_data.get('health_conditions'),
                     allergies=medical_data.get('allergies'),
                     special_needs=medical_data.get('special_needs')
-                )
-                db.add(medical)
+                ))
 
-            # 6. Create Student Account (Inactive)
-            # Generate temporary password
-            temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(8))
-            username = f"std_{student.id}_{secrets.choice(string.digits)}{secrets.choice(string.digits)}" # Basic username for now
-            
-            account = StudentAccount(
-                student_id=student.id,
-                username=username,
-                hashed_password=get_password_hash(temp_password),
-                must_change_password=True,
-                is_active=False
-            )
-            db.add(account)
-
-            # 7. Create Admission (Pending)
-            admission = Admission(
-                student_id=student.id,
+            # 6. Create Admission (Pending)
+            admission_id = db.execute(insert(Admission).values(
+                student_id=student_id,
                 academic_year_id=placement_data['academic_year_id'],
                 class_id=placement_data['class_id'],
                 stream_id=placement_data.get('stream_id'),
                 term_id=placement_data['term_id'],
                 voucher_id=voucher.id,
                 status=AdmissionStatus.Pending
-            )
-            db.add(admission)
-            db.flush()
+            ).returning(Admission.id)).scalar_one()
+
+            # 7. Create Student Account (Inactive)
+            username = f"std_{student_id}_{secrets.choice(string.digits)}{secrets.choice(string.digits)}" # Basic username for now
+            db.execute(insert(StudentAccount).values(
+                student_id=student_id,
+                username=username,
+                hashed_password=password_hash,
+                must_change_password=True,
+                is_active=False
+            ))
 
             # 8. Log Action
-            audit = AuditLog(
+            db.execute(insert(AuditLog).values(
                 entity="Admission",
-                entity_id=admission.id,
+                entity_id=admission_id,
                 action="CREATE_PENDING",
                 notes=f"Pending admission created using voucher {voucher.voucher_number}"
-            )
-            db.add(audit)
+            ))
+            # The wizard draft, if one was saved, is consumed with the intake
+            db.execute(delete(AdmissionDraft).where(AdmissionDraft.voucher_id == voucher.id))
+            StudentService.refresh_current_enrollment(db, [student_id])
 
             db.commit()
-            db.refresh(admission)
-            
-            # Attach temp_password for UI display (response schema)
-            setattr(admission, 'temp_password', temp_password)
-            
-            return admission
-
         except Exception as e:
             db.rollback()
+            password_hash.cancel()
+            if isinstance(e, IntegrityError) and AdmissionsService._has_active_admission(db, voucher.id):
+                # Lost the race for this voucher to a concurrent submit
+                raise HTTPException(status_code=409, detail="An admission has already been submitted for this voucher")
             print(f"DEBUG: Admission creation failed: {e}", file=sys.stderr)
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Failed to create admission: {str(e)}")
 
+        admission = AdmissionsService.get_admission(db, admission_id)
+        # Attach temp_password for UI display (response schema)
+        setattr(admission, 'temp_password', temp_password)
+        return admission
+
     @staticmethod
     def approve_admission(db: Session, admission_id: int, admin_id: int) -> Admission:
         admission = db.query(Admission).filter(Admission.id == admission_id).first()
@@ -132,6 +332,10 @@ class AdmissionsService:
         if admission.status not in [AdmissionStatus.Pending, AdmissionStatus.Rejected]:
             raise HTTPException(status_code=400, detail="Admission is already processed (Approved)")
 
+        # A rejected admission's voucher may have been used for a new application since
+        if admission.status == AdmissionStatus.Rejected and AdmissionsService._has_active_admission(db, admission.voucher_id):
+            raise HTTPException(status_code=409, detail="The voucher has since been used for another admission")
+
         try:
             # 1. Update Admission status
             admission.status = AdmissionStatus.Approved
@@ -154,13 +358,9 @@ class AdmissionsService:
             level_code = admission.class_room.level[:3].upper() # JHS or PRI
             year_short = admission.academic_year.name.split('/')[0][-2:] # 26
             
-            # Simple sequence based on count in same year/level
-            seq_count = db.query(Student).join(Admission).filter(
-                Admission.academic_year_id == admission.academic_year_id,
-                Admission.status == AdmissionStatus.Approved
-            ).count()
-            
-            index_number = f"SCH/{level_code}/{year_short}/{seq_count + 1:04d}"
+            index_number = IndexNumberAllocator.next_index_number(
+                db, admission.academic_year_id, level_code, year_short
+            )
             admission.student.index_number = index_number
 
             # 5. Log Action
@@ -172,6 +372,7 @@ class AdmissionsService:
                 notes=f"Admission approved. Generated index: {index_number}"
             )
             db.add(audit)
+            StudentService.refresh_current_enrollment(db, [admission.student_id])
 
             db.commit()
             db.refresh(admission)
@@ -213,6 +414,7 @@ class AdmissionsService:
                 notes=f"Admission rejected by admin {admin_id}."
             )
             db.add(audit)
+            StudentService.refresh_current_enrollment(db, [admission.student_id])
 
             db.commit()
             db.refresh(admission)
@@ -221,3 +423,190 @@ class AdmissionsService:
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to reject admission: {str(e)}")
+
+
+    @staticmethod
+    def _load_bulk_targets(db: Session, admission_ids: List[int]) -> Dict[int, tuple]:
+        # One locked query for every target plus what the index number needs
+        rows = db.query(
+            Admission.id,
+            Admission.status,
+            Admission.student_id,
+            Admission.voucher_id,
+            Admission.academic_year_id,
+            ClassRoom.level,
+            AcademicYear.name.label("academic_year_name")
+        ).join(ClassRoom, Admission.class_id == ClassRoom.id) \
+         .join(AcademicYear, Admission.academic_year_id == AcademicYear.id) \
+         .filter(Admission.id.in_(admission_ids)) \
+         .with_for_update(of=Admission) \
+         .all()
+        return {row.id: row for row in rows}
+
+    @staticmethod
+    def bulk_approve_admissions(db: Session, admission_ids: List[int], admin_id: int) -> dict:
+        """
+        Approve many admissions in one transaction. Ineligible or missing ids
+        are reported per item; the eligible ones are approved together with
+        set-based updates, or not at all if any statement fails.
+        """
+        admission_ids = list(dict.fromkeys(admission_ids))
+        targets = AdmissionsService._load_bulk_targets(db, admission_ids)
+
+        # Vouchers with an active admission can't take back a rejected one,
+        # and two rejected admissions in this batch can't share one either
+        rejected_vouchers = [row.voucher_id for row in targets.values() if row.status == AdmissionStatus.Rejected]
+        claimed = set(db.execute(select(Admission.voucher_id).where(
+            Admission.voucher_id.in_(rejected_vouchers), Admission.status != AdmissionStatus.Rejected
+        )).scalars()) if rejected_vouchers else set()
+
+        results: Dict[int, dict] = {}
+        approvable = []
+        for admission_id in admission_ids:
+            row = targets.get(admission_id)
+            if not row:
+                results[admission_id] = {"admission_id": admission_id, "success": False, "detail": "Admission record not found"}
+            elif row.status not in [AdmissionStatus.Pending, AdmissionStatus.Rejected]:
+                results[admission_id] = {"admission_id": admission_id, "success": False, "status": row.status,
+                                         "detail": "Admission is already processed (Approved)"}
+            elif row.status == AdmissionStatus.Rejected and row.voucher_id in claimed:
+                results[admission_id] = {"admission_id": admission_id, "success": False, "status": row.status,
+                                         "detail": "The voucher has since been used for another admission"}
+            else:
+                claimed.add(row.voucher_id)
+                approvable.append(row)
+
+        if approvable:
+            try:
+                # 1. Index numbers: one block per academic year and level
+                groups: Dict[Tuple[int, str, str], list] = defaultdict(list)
+                for row in approvable:
+                    level_code = row.level[:3].upper()
+                    year_short = row.academic_year_name.split('/')[0][-2:]
+                    groups[(row.academic_year_id, level_code, year_short)].append(row)
+
+                index_numbers: Dict[int, str] = {}
+                for (academic_year_id, level_code, year_short), rows in groups.items():
+                    numbers = IndexNumberAllocator.next_index_numbers(
+                        db, academic_year_id, level_code, year_short, len(rows)
+                    )
+                    for row, number in zip(rows, numbers):
+                        index_numbers[row.id] = number
+
+                now = datetime.utcnow()
+                ids = [row.id for row in approvable]
+                student_ids = [row.student_id for row in approvable]
+
+                # 2. Admissions, vouchers and accounts in one statement each
+                db.execute(
+                    update(Admission).where(Admission.id.in_(ids))
+                    .values(status=AdmissionStatus.Approved, approved_by_admin_id=admin_id, approved_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                db.execute(
+                    update(EVoucher).where(EVoucher.id.in_([row.voucher_id for row in approvable]))
+                    .values(
+                        status=VoucherStatus.Used,
+                        used_at=now,
+                        used_by_student_id=case(
+                            {row.voucher_id: row.student_id for row in approvable}, value=EVoucher.id
+                        )
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.execute(
+                    update(StudentAccount).where(StudentAccount.student_id.in_(student_ids))
+                    .values(is_active=True)
+                    .execution_options(synchronize_session=False)
+                )
+
+                # 3. Index numbers by primary key, executed as one batch
+                db.execute(update(Student), [
+                    {"id": row.student_id, "index_number": index_numbers[row.id]} for row in approvable
+                ])
+
+                # 4. Audit trail in one multi-row insert
+                db.execute(insert(AuditLog), [
+                    {
+                        "entity": "Admission",
+                        "entity_id": row.id,
+                        "action": "APPROVE",
+                        "admin_id": admin_id,
+                        "notes": f"Admission approved. Generated index: {index_numbers[row.id]}",
+                        "created_at": now
+                    }
+                    for row in approvable
+                ])
+                StudentService.refresh_current_enrollment(db, student_ids)
+
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise HTTPException(status_code=500, detail=f"Failed to approve admissions: {str(e)}")
+
+            for row in approvable:
+                results[row.id] = {"admission_id": row.id, "success": True, "status": AdmissionStatus.Approved,
+                                   "student_index_number": index_numbers[row.id]}
+
+        return AdmissionsService._bulk_summary(admission_ids, results)
+
+    @staticmethod
+    def bulk_reject_admissions(db: Session, admission_ids: List[int], admin_id: int) -> dict:
+        """Reject many pending admissions in one transaction, releasing their vouchers."""
+        admission_ids = list(dict.fromkeys(admission_ids))
+        targets = AdmissionsService._load_bulk_targets(db, admission_ids)
+
+        results: Dict[int, dict] = {}
+        rejectable = []
+        for admission_id in admission_ids:
+            row = targets.get(admission_id)
+            if not row:
+                results[admission_id] = {"admission_id": admission_id, "success": False, "detail": "Admission record not found"}
+            elif row.status != AdmissionStatus.Pending:
+                results[admission_id] = {"admission_id": admission_id, "success": False, "status": row.status,
+                                         "detail": "Admission is already processed"}
+            else:
+                rejectable.append(row)
+
+        if rejectable:
+            try:
+                now = datetime.utcnow()
+                db.execute(
+                    update(Admission).where(Admission.id.in_([row.id for row in rejectable]))
+                    .values(status=AdmissionStatus.Rejected)
+                    .execution_options(synchronize_session=False)
+                )
+                # Same policy as reject_admission: the voucher becomes reusable
+                db.execute(
+                    update(EVoucher).where(EVoucher.id.in_([row.voucher_id for row in rejectable]))
+                    .values(status=VoucherStatus.Unused, reserved_at=None, reserved_session_id=None)
+                    .execution_options(synchronize_session=False)
+                )
+                db.execute(insert(AuditLog), [
+                    {
+                        "entity": "Admission",
+                        "entity_id": row.id,
+                        "action": "REJECT",
+                        "admin_id": admin_id,
+                        "notes": f"Admission rejected by admin {admin_id}.",
+                        "created_at": now
+                    }
+                    for row in rejectable
+                ])
+                StudentService.refresh_current_enrollment(db, [row.student_id for row in rejectable])
+
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise HTTPException(status_code=500, detail=f"Failed to reject admissions: {str(e)}")
+
+            for row in rejectable:
+                results[row.id] = {"admission_id": row.id, "success": True, "status": AdmissionStatus.Rejected}
+
+        return AdmissionsService._bulk_summary(admission_ids, results)
+
+    @staticmethod
+    def _bulk_summary(admission_ids: List[int], results: Dict[int, dict]) -> dict:
+        items = [results[admission_id] for admission_id in admission_ids]
+        succeeded = sum(1 for item in items if item["success"])
+        return {"succeeded": succeeded, "failed": len(items) - succeeded, "results": items}
@@ -0,0 +1,90 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import insert
+from app.core.config import settings
+from app.db.session import SessionLocal
+from .models import VoucherAttemptLog, VoucherAttemptResult
+
+logger = logging.getLogger(__name__)
+
+class AttemptLogWriter:
+    """
+    Buffers VoucherAttemptLog rows in memory and writes them in one
+    multi-row insert per interval, keeping log writes off the verify path.
+    The buffer is bounded: under a flood the oldest pending rows are dropped.
+    """
+
+    def __init__(self, flush_interval: float, max_buffer: int, batch_size: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def record(self, voucher_number: str, ip_address: str, user_agent: str, result: VoucherAttemptResult):
+        row = {
+            "voucher_number_entered": voucher_number,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "result": result,
+            "created_at": datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(row)
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        if not rows:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(insert(VoucherAttemptLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Failed to flush {len(rows)} voucher attempt log rows")
+            return 0
+        finally:
+            db.close()
+        return len(rows)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="voucher-attempt-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+attempt_log_writer = AttemptLogWriter(
+    flush_interval=settings.VOUCHER_ATTEMPT_LOG_FLUSH_SECONDS,
+    max_buffer=settings.VOUCHER_ATTEMPT_LOG_MAX_BUFFER,
+    batch_size=settings.VOUCHER_ATTEMPT_LOG_BATCH_SIZE,
+)
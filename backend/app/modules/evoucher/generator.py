@@ -0,0 +1,156 @@
+import csv
+import enum
+import hashlib
+import io
+import logging
+import os
+import secrets
+import string
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.executors import map_on_process_pool
+from app.core.security import get_password_hashes
+from .models import EVoucher, VoucherStatus
+
+logger = logging.getLogger(__name__)
+
+VOUCHER_NUMBER_LENGTH = 10
+PIN_LENGTH = 6
+
+EVOUCHER_COPY_COLUMNS = (
+    "voucher_number", "pin_hash", "academic_year_id", "status",
+    "expires_at", "created_at", "created_by_admin_id", "batch_job_id",
+)
+
+def generate_random_string(length: int, chars: str = string.digits) -> str:
+    return ''.join(secrets.choice(chars) for _ in range(length))
+
+def _allocate_voucher_numbers(db: Session, size: int, seen: Set[str]) -> List[str]:
+    """Draw `size` voucher numbers that are unique in this batch and in the DB."""
+    numbers: List[str] = []
+    while len(numbers) < size:
+        candidates = set()
+        while len(candidates) < size - len(numbers):
+            number = generate_random_string(VOUCHER_NUMBER_LENGTH)
+            if number not in seen:
+                candidates.add(number)
+
+        taken = set(db.execute(
+            select(EVoucher.voucher_number).where(EVoucher.voucher_number.in_(candidates))
+        ).scalars())
+        for number in candidates - taken:
+            seen.add(number)
+            numbers.append(number)
+    return numbers
+
+def _hash_pins(pins: List[str]) -> List[str]:
+    """Fan PIN hashing out over the shared process pool, preserving order."""
+    workers = max(settings.CPU_POOL_WORKERS, 1)
+    part_size = -(-len(pins) // workers)
+    parts = [pins[i:i + part_size] for i in range(0, len(pins), part_size)]
+    return list(chain.from_iterable(map_on_process_pool(get_password_hashes, parts)))
+
+def _copy_vouchers(db: Session, rows: List[dict]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = [row[c] for c in EVOUCHER_COPY_COLUMNS]
+        writer.writerow([
+            "" if v is None else v.value if isinstance(v, enum.Enum) else v
+            for v in values
+        ])
+    buffer.seek(0)
+
+    # Runs on the session's own connection so it shares the surrounding transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {EVoucher.__tablename__} ({', '.join(EVOUCHER_COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+def bulk_insert_vouchers(db: Session, rows: List[dict]):
+    """Insert voucher rows without building ORM objects (COPY on psycopg2)."""
+    if not rows:
+        return
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_vouchers(db, rows)
+    else:
+        db.execute(insert(EVoucher), rows)
+
+def iter_voucher_chunks(
+    db: Session,
+    academic_year_id: int,
+    expires_at: datetime,
+    count: int,
+    created_by_admin_id: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    batch_job_id: Optional[int] = None,
+) -> Iterator[List[Tuple[str, str]]]:
+    """
+    Generate `count` vouchers in committed chunks, yielding the plaintext
+    (voucher_number, pin) pairs of each chunk once it is persisted.
+    Memory use is bounded by the chunk size, not the batch size.
+    """
+    chunk_size = chunk_size or settings.VOUCHER_BATCH_CHUNK_SIZE
+    seen: Set[str] = set()
+    remaining = count
+
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        numbers = _allocate_voucher_numbers(db, size, seen)
+        pins = [generate_random_string(PIN_LENGTH) for _ in range(size)]
+        pin_hashes = _hash_pins(pins)
+
+        now = datetime.utcnow()
+        bulk_insert_vouchers(db, [
+            {
+                "voucher_number": number,
+                "pin_hash": pin_hash,
+                "academic_year_id": academic_year_id,
+                "status": VoucherStatus.Unused,
+                "expires_at": expires_at,
+                "created_at": now,
+                "created_by_admin_id": created_by_admin_id,
+                "batch_job_id": batch_job_id,
+            }
+            for number, pin_hash in zip(numbers, pin_hashes)
+        ])
+        db.commit()
+
+        remaining -= size
+        yield list(zip(numbers, pins))
+
+def iter_voucher_csv(chunks: Iterable[List[Tuple[str, str]]], expires_at: datetime) -> Iterator[Tuple[str, int]]:
+    """
+    Render voucher chunks as printable CSV text, one block per chunk.
+    Yields (text, vouchers_in_block) so callers can track progress.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["serial", "voucher_number", "pin", "expires_at"])
+    yield buffer.getvalue(), 0
+
+    serial = 0
+    expires = expires_at.strftime("%Y-%m-%d")
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for number, pin in chunk:
+            serial += 1
+            writer.writerow([serial, number, pin, expires])
+        yield buffer.getvalue(), len(chunk)
+
+def hash_download_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def batch_export_path(job_id: int) -> str:
+    return os.path.join(os.getcwd(), settings.VOUCHER_EXPORT_DIR, f"voucher_batch_{job_id}.csv")
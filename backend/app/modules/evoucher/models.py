@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, DateTime, ForeignKey, Index, Text, Boolean
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -19,6 +19,12 @@ class VoucherAttemptResult(str, enum.Enum):
     Used = "Used"
     Reserved = "Reserved"
 
+class VoucherBatchJobStatus(str, enum.Enum):
+    Queued = "Queued"
+    Running = "Running"
+    Completed = "Completed"
+    Failed = "Failed"
+
 class EVoucher(Base):
     id = Column(Integer, primary_key=True, index=True)
     voucher_number = Column(String, unique=True, index=True, nullable=False)
@@ -35,11 +41,22 @@ class EVoucher(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by_admin_id = Column(Integer, nullable=True) # Will link to user later
+    # Set for vouchers generated by a batch job, so a failed batch can revoke them
+    batch_job_id = Column(Integer, ForeignKey("voucherbatchjob.id"), nullable=True, index=True)
     
     academic_year = relationship("AcademicYear")
     used_by_student = relationship("Student")
     admission = relationship("Admission", back_populates="voucher", uselist=False)
 
+    __table_args__ = (
+        # Keyset pagination order for the admin voucher listing
+        Index("ix_evoucher_academic_year_id_status_id", "academic_year_id", "status", "id"),
+        # Lets voucher number prefix searches (LIKE '123%') use an index on PostgreSQL
+        Index("ix_evoucher_voucher_number_pattern", "voucher_number", postgresql_ops={"voucher_number": "varchar_pattern_ops"}),
+        # Substring search from the admissions dashboard (requires pg_trgm)
+        Index("ix_evoucher_voucher_number_trgm", "voucher_number", postgresql_using="gin", postgresql_ops={"voucher_number": "gin_trgm_ops"}),
+    )
+
 class VoucherAttemptLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     voucher_number_entered = Column(String, index=True)
@@ -47,3 +64,26 @@ class VoucherAttemptLog(Base):
     user_agent = Column(String)
     result = Column(SqlEnum(VoucherAttemptResult, values_callable=lambda x: [e.value for e in x]))
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class VoucherBatchJob(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    academic_year_id = Column(Integer, ForeignKey("academicyear.id"), nullable=False)
+    count = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    status = Column(SqlEnum(VoucherBatchJobStatus, values_callable=lambda x: [e.value for e in x]), default=VoucherBatchJobStatus.Queued)
+    generated_count = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    # Exports are generated while being downloaded instead of spooled to disk
+    stream_on_download = Column(Boolean, default=False, nullable=False)
+    download_token_hash = Column(String, unique=True, index=True, nullable=True)
+    downloaded_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by_admin_id = Column(Integer, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    # Bumped on every committed chunk; a stale one means the worker is gone
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    academic_year = relationship("AcademicYear")
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
-from . import schemas, service, models
+from typing import List, Literal, Optional
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.proxy import client_ip
+from app.db.session import get_async_db, get_db
+from . import schemas, service, models, sweeper
 
 router = APIRouter()
 
@@ -14,16 +18,16 @@ def verify_voucher(
     request: Request,
     db: Session = Depends(get_db)
 ):
-    ip_address = request.client.host
+    ip_address = client_ip(request)
     user_agent = request.headers.get("user-agent", "unknown")
     return service.EVoucherService.verify_voucher(db, obj_in, ip_address, user_agent)
 
 @router.get("/check-session/{session_token}", response_model=schemas.EVoucherSessionResponse)
-def check_session(
+async def check_session(
     session_token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return service.EVoucherService.check_session(db, session_token)
+    return await service.EVoucherService.check_session(db, session_token)
 
 @router.delete("/release-session/{session_token}", response_model=schemas.VoucherActionResponse)
 def release_session(
@@ -45,36 +49,106 @@ def create_vouchers(
     # TODO: Add admin permission check
     return service.EVoucherService.create_vouchers(db, obj_in)
 
+def _batch_download(request: Request, job: models.VoucherBatchJob, download_token: str) -> dict:
+    return {
+        "job": job,
+        "download_token": download_token,
+        "download_url": str(request.url_for("download_voucher_export", download_token=download_token))
+    }
+
+@router.post("/admin/vouchers/jobs", response_model=schemas.EVoucherBatchDownload, status_code=202)
+def create_voucher_batch_job(
+    obj_in: schemas.EVoucherBatchJobCreate,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    # TODO: Add admin permission check
+    job, download_token = service.EVoucherService.create_batch_job(db, obj_in)
+    return _batch_download(request, job, download_token)
+
+@router.get("/admin/vouchers/jobs/{job_id}", response_model=schemas.EVoucherBatchJobResponse)
+def get_voucher_batch_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    # TODO: Add admin permission check
+    return service.EVoucherService.get_batch_job(db, job_id)
+
+@router.post("/admin/vouchers/exports", response_model=schemas.EVoucherBatchDownload, status_code=201)
+def create_voucher_export(
+    obj_in: schemas.EVoucherBatchJobCreate,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Reserve a voucher batch that is generated while it is downloaded, so
+    PINs never touch disk. The returned link works exactly once.
+    """
+    # TODO: Add admin permission check
+    job, download_token = service.EVoucherService.create_batch_job(db, obj_in, stream_on_download=True)
+    return _batch_download(request, job, download_token)
+
+@router.get("/admin/vouchers/exports/{download_token}", name="download_voucher_export")
+def download_voucher_export(
+    download_token: str,
+    db: Session = Depends(get_db)
+):
+    # The one-time token is the credential, so the bursar's office can open the link directly
+    job = service.EVoucherService.redeem_download_token(db, download_token)
+    return StreamingResponse(
+        service.EVoucherService.stream_batch_export(job.id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="voucher_batch_{job.id}.csv"'}
+    )
+
 @router.get("/admin/vouchers", response_model=schemas.PaginatedEVoucherResponse)
 def list_vouchers(
     academic_year_id: int = None,
     status: models.VoucherStatus = None,
-    page: int = 1,
-    size: int = 50,
+    number_prefix: Optional[str] = Query(None, max_length=10),
+    cursor: Optional[str] = None,
+    size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    count: Literal["exact", "estimated", "none"] = "exact",
     db: Session = Depends(get_db)
 ):
     # TODO: Add admin permission check
-    query = db.query(models.EVoucher)
-    if academic_year_id:
-        query = query.filter(models.EVoucher.academic_year_id == academic_year_id)
-    if status:
-        query = query.filter(models.EVoucher.status == status)
-    
-    total = query.count()
-    skip = (page - 1) * size
-    items = query.offset(skip).limit(size).all()
+    return service.EVoucherService.list_vouchers(
+        db,
+        academic_year_id=academic_year_id,
+        status=status,
+        number_prefix=number_prefix,
+        cursor=cursor,
+        size=size,
+        count=count
+    )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "size": size
-    }
+@router.get("/admin/verify-stats", response_model=schemas.VoucherVerifyStats)
+def get_verify_stats():
+    # TODO: Add admin permission check
+    # Counters are per worker process
+    return service.EVoucherService.get_verify_stats()
 
 @router.delete("/admin/cleanup-reservations", response_model=schemas.VoucherActionResponse)
 def cleanup_expired_reservations(
     db: Session = Depends(get_db)
 ):
     # TODO: Add admin permission check
-    count = service.EVoucherService.cleanup_expired_reservations(db)
-    return {"message": f"Cleaned up {count} expired reservations", "success": True}
+    # The background sweeper does this periodically; this runs it on demand
+    result = sweeper.sweep_vouchers(db)
+    return {
+        "message": f"Cleaned up {result['released_reservations']} expired reservations, "
+                   f"expired {result['expired_vouchers']} vouchers, "
+                   f"purged {result['purged_idempotency_keys']} idempotency keys "
+                   f"and {result['purged_drafts']} admission drafts, "
+                   f"and recovered {result['recovered_jobs']} batch jobs",
+        "success": True
+    }
+
+@router.get("/admin/sweeper", response_model=schemas.VoucherSweepStatus)
+def get_sweeper_status():
+    # TODO: Add admin permission check
+    return {
+        "leader": sweeper.voucher_sweeper.lock.held,
+        "interval_seconds": sweeper.voucher_sweeper.interval_seconds,
+        "last_result": sweeper.voucher_sweeper.last_result
+    }
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
-from .models import VoucherStatus, VoucherAttemptResult
+from .models import VoucherStatus, VoucherAttemptResult, VoucherBatchJobStatus
 
 class EVoucherBase(BaseModel):
     voucher_number: str
@@ -13,6 +13,33 @@ class EVoucherCreate(BaseModel):
     count: int = Field(..., gt=0, le=1000) # max 1000 vouchers at once
     expires_at: datetime
 
+class EVoucherBatchJobCreate(BaseModel):
+    academic_year_id: int
+    count: int = Field(..., gt=0, le=100000) # async jobs handle a full year's vouchers
+    expires_at: datetime
+
+class EVoucherBatchJobResponse(BaseModel):
+    id: int
+    academic_year_id: int
+    count: int
+    expires_at: datetime
+    status: VoucherBatchJobStatus
+    generated_count: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stream_on_download: bool = False
+    downloaded_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class EVoucherBatchDownload(BaseModel):
+    job: EVoucherBatchJobResponse
+    download_token: str
+    download_url: str
+
 class EVoucherResponse(EVoucherBase):
     id: int
     status: VoucherStatus
@@ -42,8 +69,29 @@ class VoucherActionResponse(BaseModel):
     message: str
     success: bool
 
+class VoucherVerifyStats(BaseModel):
+    throttled: int
+    hashes_saved: int
+    hashes_computed: int
+    status_cache_hits: int
+    status_cache_size: int
+
+class VoucherSweepResult(BaseModel):
+    released_reservations: int
+    expired_vouchers: int
+    purged_idempotency_keys: int = 0
+    purged_drafts: int = 0
+    recovered_jobs: int = 0
+    duration_ms: float
+
+class VoucherSweepStatus(BaseModel):
+    leader: bool
+    interval_seconds: float
+    last_result: Optional[VoucherSweepResult] = None
+
 class PaginatedEVoucherResponse(BaseModel):
     items: List[EVoucherResponse]
-    total: int
-    page: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     size: int
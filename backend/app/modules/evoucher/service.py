@@ -1,90 +1,344 @@
+import logging
+import os
 import secrets
-import string
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
-from .models import EVoucher, VoucherStatus, VoucherAttemptLog, VoucherAttemptResult
-from .schemas import EVoucherCreate, EVoucherVerify, EVoucherSessionResponse
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import VOUCHER_VERIFICATIONS
+from app.core.pagination import decode_cursor, encode_cursor, escape_like, estimate_count
+from app.core.security import verify_password
+from app.core.throttling import Throttle, ThrottleMetrics, create_throttle_store
+from app.db.session import SessionLocal
+from app.modules.academics.models import AcademicYear
+from .models import EVoucher, VoucherStatus, VoucherAttemptLog, VoucherAttemptResult, VoucherBatchJob, VoucherBatchJobStatus
+from .schemas import EVoucherCreate, EVoucherVerify, EVoucherSessionResponse, EVoucherBatchJobCreate
+from .attempt_log import attempt_log_writer
+from .generator import generate_random_string, iter_voucher_chunks, iter_voucher_csv, batch_export_path, hash_download_token
+
+logger = logging.getLogger(__name__)
 
 RESERVATION_TTL_MINUTES = 15
+EXPORT_READ_BLOCK_SIZE = 64 * 1024
+
+# voucher_number -> (rejection reason, voucher exists) for vouchers that can
+# never verify (unknown, used, revoked, expired). Per worker; entries age out via TTL.
+voucher_status_cache = TTLCache(maxsize=settings.VOUCHER_STATUS_CACHE_SIZE, ttl=settings.VOUCHER_STATUS_CACHE_TTL_SECONDS)
+
+# Failed verifications per client IP and per entered voucher number
+throttle_store = create_throttle_store()
+verify_ip_throttle = Throttle(
+    throttle_store, "voucher-verify-ip",
+    settings.VOUCHER_VERIFY_IP_LIMIT, settings.VOUCHER_VERIFY_WINDOW_SECONDS
+)
+verify_number_throttle = Throttle(
+    throttle_store, "voucher-verify-number",
+    settings.VOUCHER_VERIFY_NUMBER_LIMIT, settings.VOUCHER_VERIFY_WINDOW_SECONDS
+)
+verify_metrics = ThrottleMetrics()
 
-def generate_random_string(length: int, chars: str = string.digits) -> str:
-    return ''.join(secrets.choice(chars) for _ in range(length))
+def forget_cached_vouchers(chunk: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # Newly issued numbers may still be negatively cached from earlier guesses
+    for number, _ in chunk:
+        voucher_status_cache.pop(number)
+    return chunk
+
+# Batch jobs run one at a time per worker, off the request threadpool
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="voucher-jobs")
 
 class EVoucherService:
     @staticmethod
     def create_vouchers(db: Session, obj_in: EVoucherCreate) -> list:
         vouchers_data = []
-        for _ in range(obj_in.count):
-            voucher_number = generate_random_string(10) # 10 digit voucher
-            pin = generate_random_string(6) # 6 digit PIN
-            pin_hash = get_password_hash(pin)
-            
-            db_obj = EVoucher(
-                voucher_number=voucher_number,
-                pin_hash=pin_hash,
-                academic_year_id=obj_in.academic_year_id,
-                expires_at=obj_in.expires_at,
-                status=VoucherStatus.Unused
+        for chunk in iter_voucher_chunks(db, obj_in.academic_year_id, obj_in.expires_at, obj_in.count):
+            forget_cached_vouchers(chunk)
+            vouchers_data.extend({"voucher_number": number, "pin": pin} for number, pin in chunk)
+        return vouchers_data
+
+    @staticmethod
+    def create_batch_job(
+        db: Session, obj_in: EVoucherBatchJobCreate, admin_id: int = None, stream_on_download: bool = False
+    ) -> Tuple[VoucherBatchJob, str]:
+        """
+        Register a voucher batch and issue its one-time download token.
+        Spooled jobs start generating immediately; streamed exports are
+        generated while the token is being downloaded.
+        """
+        if not db.get(AcademicYear, obj_in.academic_year_id):
+            raise HTTPException(status_code=404, detail="Academic year not found")
+
+        download_token = secrets.token_urlsafe(32)
+        job = VoucherBatchJob(
+            academic_year_id=obj_in.academic_year_id,
+            count=obj_in.count,
+            expires_at=obj_in.expires_at,
+            status=VoucherBatchJobStatus.Queued,
+            generated_count=0,
+            created_by_admin_id=admin_id,
+            stream_on_download=stream_on_download,
+            download_token_hash=hash_download_token(download_token)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        if not stream_on_download:
+            _job_executor.submit(EVoucherService.run_batch_job, job.id)
+        return job, download_token
+
+    @staticmethod
+    def _revoke_undelivered(db: Session, job_id: int) -> int:
+        """Revoke a failed job's vouchers: their PINs were never delivered."""
+        return db.execute(
+            update(EVoucher).where(
+                EVoucher.batch_job_id == job_id,
+                EVoucher.status == VoucherStatus.Unused
+            ).values(status=VoucherStatus.Revoked).execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def _fail_job(db: Session, job: VoucherBatchJob, error: str):
+        db.rollback()
+        revoked = EVoucherService._revoke_undelivered(db, job.id)
+        job.status = VoucherBatchJobStatus.Failed
+        job.error = f"{error}; revoked {revoked} undelivered vouchers" if revoked else error
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def _generate_job_csv(db: Session, job: VoucherBatchJob) -> Iterator[str]:
+        """Run a job's generation pipeline, yielding it as CSV text chunk by chunk."""
+        try:
+            job.status = VoucherBatchJobStatus.Running
+            job.started_at = job.heartbeat_at = datetime.utcnow()
+            db.commit()
+
+            chunks = iter_voucher_chunks(
+                db, job.academic_year_id, job.expires_at, job.count,
+                created_by_admin_id=job.created_by_admin_id, batch_job_id=job.id
             )
-            db.add(db_obj)
-            vouchers_data.append({"voucher_number": voucher_number, "pin": pin})
-        
+            chunks = map(forget_cached_vouchers, chunks)
+            for text, generated in iter_voucher_csv(chunks, job.expires_at):
+                yield text
+                if generated:
+                    job.generated_count += generated
+                    job.heartbeat_at = datetime.utcnow()
+                    db.commit()
+
+            job.status = VoucherBatchJobStatus.Completed
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        except GeneratorExit:
+            # Client went away mid-download (the token is spent) or the spool write failed
+            EVoucherService._fail_job(db, job, f"Export interrupted after {job.generated_count} vouchers")
+            raise
+        except Exception as e:
+            logger.exception(f"Voucher batch job {job.id} failed")
+            EVoucherService._fail_job(db, job, str(e))
+            raise
+
+    @staticmethod
+    def run_batch_job(job_id: int):
+        """Generate a queued job's vouchers into a private CSV spool."""
+        db = SessionLocal()
+        path = batch_export_path(job_id)
+        try:
+            # Claim it, so a job re-enqueued by recover_stale_jobs only runs once
+            claimed = db.execute(update(VoucherBatchJob).where(
+                VoucherBatchJob.id == job_id,
+                VoucherBatchJob.status == VoucherBatchJobStatus.Queued
+            ).values(
+                status=VoucherBatchJobStatus.Running, started_at=datetime.utcnow(), heartbeat_at=datetime.utcnow()
+            )).rowcount
+            db.commit()
+            if not claimed:
+                return
+            job = db.get(VoucherBatchJob, job_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Plaintext PINs: keep the spool readable by the app user only
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", newline="") as spool:
+                for text in EVoucherService._generate_job_csv(db, job):
+                    spool.write(text)
+        except Exception:
+            # Already recorded on the job by _generate_job_csv
+            if os.path.exists(path):
+                os.remove(path)
+        finally:
+            db.close()
+
+    @staticmethod
+    def recover_stale_jobs(db: Session) -> int:
+        """
+        Job queues live in one worker's memory, so a restart or timeout can
+        strand jobs. Queued spooled jobs are re-enqueued here; Running ones
+        whose heartbeat went stale are failed, their committed vouchers
+        revoked and their partial spool removed.
+        """
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.VOUCHER_BATCH_JOB_STALE_MINUTES)
+        stale = db.execute(select(VoucherBatchJob).where(
+            VoucherBatchJob.status == VoucherBatchJobStatus.Running,
+            func.coalesce(VoucherBatchJob.heartbeat_at, VoucherBatchJob.started_at) < cutoff
+        )).scalars().all()
+        for job in stale:
+            revoked = EVoucherService._revoke_undelivered(db, job.id)
+            job.status = VoucherBatchJobStatus.Failed
+            job.error = f"Worker stopped after generating {job.generated_count} vouchers; revoked {revoked} undelivered vouchers"
+            job.finished_at = datetime.utcnow()
+            path = batch_export_path(job.id)
+            if os.path.exists(path):
+                os.remove(path)
+
+        # Streamed jobs stay Queued until downloaded, they are not in any queue
+        queued = db.execute(select(VoucherBatchJob.id).where(
+            VoucherBatchJob.status == VoucherBatchJobStatus.Queued,
+            VoucherBatchJob.stream_on_download.is_(False),
+            VoucherBatchJob.created_at < cutoff
+        )).scalars().all()
         db.commit()
-        return vouchers_data
+        for job_id in queued:
+            _job_executor.submit(EVoucherService.run_batch_job, job_id)
+
+        if stale or queued:
+            logger.warning(f"Recovered voucher batch jobs: failed {len(stale)} stalled, re-enqueued {len(queued)}")
+        return len(stale) + len(queued)
+
+    @staticmethod
+    def get_batch_job(db: Session, job_id: int) -> VoucherBatchJob:
+        job = db.get(VoucherBatchJob, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Voucher batch job not found")
+        return job
+
+    @staticmethod
+    def redeem_download_token(db: Session, download_token: str) -> VoucherBatchJob:
+        """Atomically consume a download token so a batch can only be fetched once."""
+        job = db.query(VoucherBatchJob).filter(
+            VoucherBatchJob.download_token_hash == hash_download_token(download_token)
+        ).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Download link not found")
+        if not job.stream_on_download and job.status != VoucherBatchJobStatus.Completed:
+            raise HTTPException(status_code=409, detail="Voucher batch is not ready for download yet")
+
+        consumed = db.query(VoucherBatchJob).filter(
+            VoucherBatchJob.id == job.id,
+            VoucherBatchJob.downloaded_at.is_(None)
+        ).update({VoucherBatchJob.downloaded_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        if not consumed:
+            raise HTTPException(status_code=410, detail="Voucher batch has already been downloaded")
+        return job
+
+    @staticmethod
+    def stream_batch_export(job_id: int) -> Iterator[str]:
+        """
+        Yield a redeemed batch as CSV. Streamed exports are generated on the
+        fly; spooled jobs are read back in blocks and the spool is removed
+        once fully sent. The token is spent either way, so a download that
+        breaks off fails the job and revokes its vouchers.
+        Uses its own session since it outlives the request's dependencies.
+        """
+        db = SessionLocal()
+        try:
+            job = db.get(VoucherBatchJob, job_id)
+            if job.stream_on_download:
+                yield from EVoucherService._generate_job_csv(db, job)
+                return
+
+            path = batch_export_path(job_id)
+            try:
+                with open(path, "r", newline="") as spool:
+                    while block := spool.read(EXPORT_READ_BLOCK_SIZE):
+                        yield block
+            except GeneratorExit:
+                EVoucherService._fail_job(db, job, "Download interrupted; the batch was not delivered")
+                raise
+            except Exception as e:
+                logger.exception(f"Voucher batch job {job_id} export failed")
+                EVoucherService._fail_job(db, job, f"Download failed: {e}")
+                raise
+            finally:
+                # Revoked before this on failure, so no live PINs are lost with it
+                if os.path.exists(path):
+                    os.remove(path)
+        finally:
+            db.close()
 
     @staticmethod
     def verify_voucher(db: Session, obj_in: EVoucherVerify, ip_address: str, user_agent: str) -> EVoucherSessionResponse:
-        voucher = db.query(EVoucher).filter(EVoucher.voucher_number == obj_in.voucher_number).first()
-        
-        # Log attempt helper
-        def log_attempt(result: VoucherAttemptResult):
-            log = VoucherAttemptLog(
-                voucher_number_entered=obj_in.voucher_number,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                result=result
+        # Over-limit clients are turned away before any lookup or hashing
+        if verify_ip_throttle.is_limited(ip_address) or verify_number_throttle.is_limited(obj_in.voucher_number):
+            # Not counted as a saved hash: the number may not even exist
+            verify_metrics.incr("throttled")
+            VOUCHER_VERIFICATIONS.labels("Throttled").inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many verification attempts. Please try again later.",
+                headers={"Retry-After": str(settings.VOUCHER_VERIFY_WINDOW_SECONDS)}
             )
-            db.add(log)
-            db.commit()
 
-        if not voucher:
-            log_attempt(VoucherAttemptResult.NotFound)
-            return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.NotFound)
+        def reject(result: VoucherAttemptResult, cache_ttl: float = None, known: bool = False, hashed: bool = False) -> EVoucherSessionResponse:
+            # `known`: the voucher exists, so the status short-circuit spared a PIN hash
+            if cache_ttl is not None:
+                voucher_status_cache.set(obj_in.voucher_number, (result, known), ttl=cache_ttl)
+            if known and not hashed:
+                verify_metrics.incr("hashes_saved")
+            verify_ip_throttle.hit(ip_address)
+            verify_number_throttle.hit(obj_in.voucher_number)
+            attempt_log_writer.record(obj_in.voucher_number, ip_address, user_agent, result)
+            VOUCHER_VERIFICATIONS.labels(result.value).inc()
+            return EVoucherSessionResponse(valid=False, reason=result)
 
-        if not verify_password(obj_in.pin, voucher.pin_hash):
-            log_attempt(VoucherAttemptResult.InvalidPin)
-            return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.InvalidPin)
+        # Vouchers that can never verify are answered from memory, before any hashing
+        cached = voucher_status_cache.get(obj_in.voucher_number)
+        if cached is not None:
+            verify_metrics.incr("status_cache_hits")
+            result, known = cached
+            return reject(result, known=known)
+
+        voucher = db.query(EVoucher).filter(EVoucher.voucher_number == obj_in.voucher_number).first()
+        if not voucher:
+            return reject(VoucherAttemptResult.NotFound, settings.VOUCHER_NEGATIVE_CACHE_TTL_SECONDS)
 
         if voucher.status == VoucherStatus.Used:
-            log_attempt(VoucherAttemptResult.Used)
-            return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.Used)
+            return reject(VoucherAttemptResult.Used, settings.VOUCHER_STATUS_CACHE_TTL_SECONDS, known=True)
 
         if voucher.status == VoucherStatus.Revoked:
-            log_attempt(VoucherAttemptResult.NotFound) # Don't leak revoked status, just say not found/invalid
-            return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.NotFound)
+            # Don't leak revoked status, just say not found/invalid
+            return reject(VoucherAttemptResult.NotFound, settings.VOUCHER_STATUS_CACHE_TTL_SECONDS, known=True)
+
+        if voucher.status == VoucherStatus.Expired:
+            return reject(VoucherAttemptResult.Expired, settings.VOUCHER_STATUS_CACHE_TTL_SECONDS, known=True)
+
+        verify_metrics.incr("hashes_computed")
+        if not verify_password(obj_in.pin, voucher.pin_hash):
+            return reject(VoucherAttemptResult.InvalidPin, known=True, hashed=True)
 
-        if voucher.expires_at < datetime.utcnow():
+        now = datetime.utcnow()
+        if voucher.expires_at < now:
             voucher.status = VoucherStatus.Expired
             db.commit()
-            log_attempt(VoucherAttemptResult.Expired)
-            return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.Expired)
+            return reject(VoucherAttemptResult.Expired, settings.VOUCHER_STATUS_CACHE_TTL_SECONDS, known=True, hashed=True)
 
-        # Handle Reservation
-        now = datetime.utcnow()
         # Even if currently RESERVED, if the correct PIN is provided (checked above),
         # we allow "taking over" the session. This prevents users from being locked out
         # if they refresh the page or clear their session.
-        
-        # All checks passed, Reserve it
         session_token = str(uuid.uuid4())
         voucher.status = VoucherStatus.Reserved
         voucher.reserved_at = now
         voucher.reserved_session_id = session_token
         db.commit()
-        
-        log_attempt(VoucherAttemptResult.Valid)
+
+        verify_number_throttle.reset(obj_in.voucher_number)
+        attempt_log_writer.record(obj_in.voucher_number, ip_address, user_agent, VoucherAttemptResult.Valid)
+        VOUCHER_VERIFICATIONS.labels(VoucherAttemptResult.Valid.value).inc()
         return EVoucherSessionResponse(
             valid=True, 
             voucher_number=voucher.voucher_number,
@@ -105,19 +359,16 @@ class EVoucherService:
         return False
 
     @staticmethod
-    def check_session(db: Session, session_token: str) -> EVoucherSessionResponse:
-        voucher = db.query(EVoucher).filter(EVoucher.reserved_session_id == session_token).first()
+    async def check_session(db: AsyncSession, session_token: str) -> EVoucherSessionResponse:
+        voucher = (await db.execute(
+            select(EVoucher).where(EVoucher.reserved_session_id == session_token)
+        )).scalars().first()
         if not voucher or voucher.status != VoucherStatus.Reserved:
             return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.NotFound)
         
-        now = datetime.utcnow()
         expires_at = voucher.reserved_at + timedelta(minutes=RESERVATION_TTL_MINUTES)
-        if expires_at < now:
-            # Session expired
-            voucher.status = VoucherStatus.Unused
-            voucher.reserved_at = None
-            voucher.reserved_session_id = None
-            db.commit()
+        if expires_at < datetime.utcnow():
+            # Lapsed reservations are released by the background sweeper
             return EVoucherSessionResponse(valid=False, reason=VoucherAttemptResult.Expired)
         
         return EVoucherSessionResponse(
@@ -127,22 +378,59 @@ class EVoucherService:
             expires_at=expires_at,
             academic_year_id=voucher.academic_year_id
         )
-            
+
     @staticmethod
-    def cleanup_expired_reservations(db: Session) -> int:
-        now = datetime.utcnow()
-        expired_time = now - timedelta(minutes=RESERVATION_TTL_MINUTES)
-        
-        expired_vouchers = db.query(EVoucher).filter(
-            EVoucher.status == VoucherStatus.Reserved,
-            EVoucher.reserved_at < expired_time
-        ).all()
-        
-        count = len(expired_vouchers)
-        for v in expired_vouchers:
-            v.status = VoucherStatus.Unused
-            v.reserved_at = None
-            v.reserved_session_id = None
-            
-        db.commit()
-        return count
+    def list_vouchers(
+        db: Session,
+        academic_year_id: Optional[int] = None,
+        status: Optional[VoucherStatus] = None,
+        number_prefix: Optional[str] = None,
+        cursor: Optional[str] = None,
+        size: int = 50,
+        count: str = "exact"
+    ) -> dict:
+        """
+        Keyset-paginated listing ordered by (academic_year_id, status, id),
+        matching ix_evoucher_academic_year_id_status_id, so deep pages cost
+        the same as the first one.
+        """
+        query = db.query(EVoucher)
+        if academic_year_id:
+            query = query.filter(EVoucher.academic_year_id == academic_year_id)
+        if status:
+            query = query.filter(EVoucher.status == status)
+        if number_prefix:
+            query = query.filter(EVoucher.voucher_number.like(f"{escape_like(number_prefix)}%", escape="\\"))
+
+        total = None
+        if count == "exact":
+            total = query.order_by(None).count()
+        elif count == "estimated":
+            total = estimate_count(db, query)
+
+        sort_key = tuple_(EVoucher.academic_year_id, EVoucher.status, EVoucher.id)
+        after = decode_cursor(cursor, (int, VoucherStatus, int))
+        if after:
+            query = query.filter(sort_key > tuple(after))
+
+        items = query.order_by(EVoucher.academic_year_id, EVoucher.status, EVoucher.id).limit(size + 1).all()
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            last = items[-1]
+            next_cursor = encode_cursor([last.academic_year_id, last.status, last.id])
+
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": count == "estimated",
+            "size": size
+        }
+
+    @staticmethod
+    def get_verify_stats() -> dict:
+        stats = {"throttled": 0, "hashes_saved": 0, "hashes_computed": 0, "status_cache_hits": 0}
+        stats.update(verify_metrics.snapshot())
+        stats["status_cache_size"] = len(voucher_status_cache)
+        return stats
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.idempotency import IdempotencyService
+from app.core.leader import LeaderLock
+from app.db.session import SessionLocal
+from app.modules.admissions.drafts import AdmissionDraftService
+from .models import EVoucher, VoucherStatus
+from .service import RESERVATION_TTL_MINUTES, EVoucherService
+
+logger = logging.getLogger(__name__)
+
+def _update_ids(db: Session, stmt) -> int:
+    if db.get_bind().dialect.update_returning:
+        return len(db.execute(stmt.returning(EVoucher.id)).scalars().all())
+    return db.execute(stmt).rowcount
+
+def sweep_vouchers(db: Session) -> dict:
+    """
+    Release lapsed reservations and expire vouchers past `expires_at`,
+    each with a single set-based UPDATE, purge expired idempotency keys and
+    drafts, and recover batch jobs stranded by a dead worker.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+
+    released = _update_ids(db, update(EVoucher).where(
+        EVoucher.status == VoucherStatus.Reserved,
+        EVoucher.reserved_at < now - timedelta(minutes=RESERVATION_TTL_MINUTES)
+    ).values(
+        status=VoucherStatus.Unused,
+        reserved_at=None,
+        reserved_session_id=None
+    ).execution_options(synchronize_session=False))
+
+    expired = _update_ids(db, update(EVoucher).where(
+        EVoucher.status == VoucherStatus.Unused,
+        EVoucher.expires_at < now
+    ).values(
+        status=VoucherStatus.Expired
+    ).execution_options(synchronize_session=False))
+
+    purged_keys = IdempotencyService.purge_expired(db)
+    purged_drafts = AdmissionDraftService.purge_expired(db)
+
+    db.commit()
+    recovered_jobs = EVoucherService.recover_stale_jobs(db)
+    return {
+        "released_reservations": released,
+        "expired_vouchers": expired,
+        "purged_idempotency_keys": purged_keys,
+        "purged_drafts": purged_drafts,
+        "recovered_jobs": recovered_jobs,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+def _run_sweep() -> dict:
+    db = SessionLocal()
+    try:
+        return sweep_vouchers(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class VoucherSweeper:
+    """
+    Lifespan-managed periodic sweep. Every worker runs the loop, but only the
+    one holding the leader lock does the work; if it dies another takes over.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.lock = LeaderLock("cschool-voucher-sweeper")
+        self.last_result: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self):
+        while True:
+            try:
+                if await run_in_threadpool(self.lock.acquire):
+                    result = await run_in_threadpool(_run_sweep)
+                    self.last_result = result
+                    if result["released_reservations"] or result["expired_vouchers"] or \
+                            result["purged_idempotency_keys"] or result["purged_drafts"] or result["recovered_jobs"]:
+                        logger.info(
+                            f"Voucher sweep: released {result['released_reservations']} reservations, "
+                            f"expired {result['expired_vouchers']} vouchers, "
+                            f"purged {result['purged_idempotency_keys']} idempotency keys and "
+                            f"{result['purged_drafts']} admission drafts, "
+                            f"recovered {result['recovered_jobs']} batch jobs in {result['duration_ms']}ms"
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Voucher sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.lock.release)
+
+voucher_sweeper = VoucherSweeper(settings.VOUCHER_SWEEP_INTERVAL_SECONDS)
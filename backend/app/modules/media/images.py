@@ -0,0 +1,123 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from sqlalchemy import update
+from app.core.config import settings
+from app.core.executors import submit_to_process_pool
+from app.db.session import SessionLocal
+from .models import MediaObject
+from .storage import get_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError: # Pillow is optional; without it only originals are stored
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Stores finished derivatives, off the process pool's result thread
+_store_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="media-derivatives")
+
+# Leading bytes of each accepted format -> stored extension
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+# New uploads are stored as .jpg; legacy uploads kept the client's .jpeg
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".gif": "image/gif", ".webp": "image/webp"
+}
+
+# Longest edge in pixels of each WebP derivative
+DERIVATIVE_SIZES = {"thumb": 96, "profile": 320}
+DERIVATIVE_QUALITY = 80
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Extension for the image format `head` starts with, judged by content only."""
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+def derivatives_enabled() -> bool:
+    return Image is not None
+
+def derivative_filename(key: str, variant: str) -> str:
+    return f"{os.path.splitext(key)[0]}_{variant}.webp"
+
+def derivative_keys(key: str) -> Dict[str, str]:
+    if not derivatives_enabled():
+        return {}
+    return {variant: derivative_filename(key, variant) for variant in DERIVATIVE_SIZES}
+
+def make_derivatives(source_path: str) -> Dict[str, str]:
+    """
+    Write a WebP derivative of the image at `source_path` for each
+    DERIVATIVE_SIZES entry, next to it, and return their paths by variant.
+    Top-level so it can run in the process pool.
+    """
+    Image.MAX_IMAGE_PIXELS = settings.MEDIA_MAX_IMAGE_PIXELS
+    written = {}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+        for variant, size in DERIVATIVE_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            target = derivative_filename(source_path, variant)
+            resized.save(target, "WEBP", quality=DERIVATIVE_QUALITY, method=4)
+            written[variant] = target
+    return written
+
+def store_derivatives(key: str, paths: Dict[str, str]):
+    """Store the derivative files written by make_derivatives beside `key`, then flag them ready."""
+    storage = get_storage()
+    try:
+        for variant, path in paths.items():
+            storage.save(derivative_filename(key, variant), path, "image/webp")
+    finally:
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    db = SessionLocal()
+    try:
+        db.execute(update(MediaObject).where(MediaObject.storage_key == key).values(derivatives_ready=True))
+        db.commit()
+    finally:
+        db.close()
+
+def _store_derivatives(future, key: str, source_path: str):
+    try:
+        error = future.exception()
+        if error:
+            logger.error(f"Failed to create derivatives for {key}: {error}")
+            return
+        store_derivatives(key, future.result())
+    except Exception:
+        logger.exception(f"Failed to store derivatives for {key}")
+    finally:
+        if os.path.exists(source_path):
+            os.remove(source_path)
+
+def schedule_derivatives(key: str, source_path: str) -> Dict[str, str]:
+    """
+    Build derivatives of the staged upload at `source_path` on the shared
+    process pool, then store them beside `key` and delete the staged file.
+    Returns the derivative keys that will appear once that finishes.
+    """
+    if not derivatives_enabled():
+        os.remove(source_path)
+        return {}
+    future = submit_to_process_pool(make_derivatives, source_path)
+    # Done callbacks run on the pool's result thread; storing (an S3 PUT, a DB
+    # write) there would hold up every other pool user's results
+    future.add_done_callback(lambda f: _store_executor.submit(_store_derivatives, f, key, source_path))
+    return derivative_keys(key)
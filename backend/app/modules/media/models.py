@@ -0,0 +1,16 @@
+from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.base_class import Base
+
+class MediaObject(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    # One row per distinct content; re-uploads of the same bytes reuse it
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    storage_key = Column(String, unique=True, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped on every deduplicated re-upload; garbage collection spares recent uploads
+    last_uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set once every derivative is stored; until then pages link the original
+    derivatives_ready = Column(Boolean, default=False, nullable=False)
@@ -1,52 +1,81 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.session import get_db
 import os
-import uuid
-import shutil
+from . import schemas
+from .images import CONTENT_TYPES, derivative_keys, derivatives_enabled, sniff_image_type
+from .service import MediaService
+from .storage import get_storage
+from .upload import receive_upload
 
 router = APIRouter()
 
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-MAX_FILE_SIZE = 1 * 1024 * 1024  # 1MB
+ALLOWED_EXTENSIONS = sorted(CONTENT_TYPES)
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    # Validate extension
-    ext = os.path.splitext(file.filename)[1].lower()
-    if ext not in ALLOWED_EXTENSIONS:
+@router.post("/upload", response_model=schemas.MediaUploadResponse, openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"]
+        }}}
+    }
+})
+async def upload_file(request: Request, db: Session = Depends(get_db)):
+    # Staged next to local storage so saving it is a hard link, not a copy
+    staging_path = os.path.join(os.getcwd(), settings.UPLOAD_DIR, ".staging")
+    os.makedirs(staging_path, exist_ok=True)
+
+    # Streamed to disk; aborted with 413 as soon as it passes the size limit
+    upload = await receive_upload(request, staging_path, settings.MEDIA_MAX_UPLOAD_SIZE)
+
+    # Validate by content, not by the client's file name
+    ext = sniff_image_type(upload.head)
+    if not ext:
+        os.remove(upload.path)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file extension. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+            detail=f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Validate size (simple check if possible, or read and check)
-    # UploadFile might not have size easily until read, but we can check after read or rely on middleware if configured
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{ext}"
-    uploads_path = os.path.join(os.getcwd(), settings.UPLOAD_DIR)
-    
-    if not os.path.exists(uploads_path):
-        os.makedirs(uploads_path)
-
-    filepath = os.path.join(uploads_path, unique_filename)
-    
     try:
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        media, created = await run_in_threadpool(MediaService.store_upload, db, upload, ext)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Could not save file: {str(e)}"
         )
-    finally:
-        file.file.close()
 
     # Return the URL for the frontend to use
-    # We return the absolute URL from the point of view of the root/domain
-    file_url = f"{settings.MEDIA_URL}/{unique_filename}"
-    
+    storage = get_storage()
     return {
-        "url": file_url,
-        "filename": unique_filename
+        "url": storage.url(media.storage_key),
+        "filename": media.storage_key,
+        "sha256": media.sha256,
+        "size": media.size,
+        "deduplicated": not created,
+        # Only linked once stored; until then clients show the original
+        "variants": {
+            variant: storage.url(key) for variant, key in derivative_keys(media.storage_key).items()
+        } if media.derivatives_ready else {},
+        "variants_pending": not media.derivatives_ready and derivatives_enabled(),
     }
+
+@router.post("/admin/garbage-collect", response_model=schemas.MediaGarbageCollectResult)
+def garbage_collect(
+    dry_run: bool = True,
+    db: Session = Depends(get_db)
+):
+    # TODO: Add admin permission check
+    return MediaService.collect_garbage(db, dry_run=dry_run)
+
+@router.post("/admin/backfill-derivatives", response_model=schemas.MediaDerivativeBackfillResult)
+def backfill_derivatives(
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    # TODO: Add admin permission check
+    return MediaService.backfill_derivatives(db, limit=limit)
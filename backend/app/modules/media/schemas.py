@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class MediaUploadResponse(BaseModel):
+    url: str
+    filename: str
+    sha256: str
+    size: int
+    deduplicated: bool = False
+    # Derivative URLs by variant, once stored. They are generated in the
+    # background after upload; until then `variants_pending` is set
+    variants: Dict[str, str] = {}
+    variants_pending: bool = False
+
+class MediaGarbageCollectResult(BaseModel):
+    dry_run: bool
+    scanned: int
+    orphaned: int
+    deleted: int
+    freed_bytes: int
+
+class MediaDerivativeBackfillResult(BaseModel):
+    registered: int
+    marked: int
+    generated: int
+    failed: int
+    remaining: int
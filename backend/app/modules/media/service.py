@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from ..students.models import Student
+from app.core.executors import submit_to_process_pool
+from .images import (
+    CONTENT_TYPES, DERIVATIVE_SIZES, derivative_filename, derivative_keys, derivatives_enabled,
+    make_derivatives, schedule_derivatives, sniff_image_type, store_derivatives
+)
+from .models import MediaObject
+from .storage import content_key, get_storage
+from .upload import SNIFF_BYTES, ReceivedUpload
+
+logger = logging.getLogger(__name__)
+
+class MediaService:
+    @staticmethod
+    def store_upload(db: Session, upload: ReceivedUpload, ext: str) -> Tuple[MediaObject, bool]:
+        """
+        Store a staged upload under its content hash. Returns the MediaObject
+        and whether it was new; identical content uploaded before is reused
+        without writing anything.
+        """
+        storage = get_storage()
+        media = db.query(MediaObject).filter(MediaObject.sha256 == upload.sha256).first()
+        if media:
+            os.remove(upload.path)
+            media.last_uploaded_at = datetime.utcnow()
+            db.commit()
+            return media, False
+
+        key = content_key(upload.sha256, ext)
+        try:
+            storage.save(key, upload.path, CONTENT_TYPES[ext])
+            media = MediaObject(
+                sha256=upload.sha256,
+                storage_key=key,
+                content_type=CONTENT_TYPES[ext],
+                size=upload.size
+            )
+            db.add(media)
+            db.commit()
+        except IntegrityError:
+            # Same content stored concurrently by another request; same key, same bytes
+            db.rollback()
+            os.remove(upload.path)
+            return db.query(MediaObject).filter(MediaObject.sha256 == upload.sha256).one(), False
+        except Exception:
+            db.rollback()
+            os.remove(upload.path)
+            raise
+
+        # Takes ownership of the staged file
+        schedule_derivatives(key, upload.path)
+        return media, True
+
+    @staticmethod
+    def referenced_keys(db: Session) -> Set[str]:
+        """Storage keys currently referenced by a student photo."""
+        storage = get_storage()
+        keys = set()
+        for (photo,) in db.query(Student.photo).filter(Student.photo.isnot(None)).distinct():
+            key = storage.key_for_url(photo)
+            if key:
+                keys.add(key)
+        return keys
+
+    @staticmethod
+    def derivative_urls(db: Session, urls: Iterable[Optional[str]], variant: str) -> Dict[str, str]:
+        """
+        Derivative URL for each of `urls` whose derivatives are known to be
+        stored, in one query. Others (legacy uploads, failed or skipped
+        generation) are left out, so callers fall back to the original.
+        """
+        storage = get_storage()
+        keys = {storage.key_for_url(url): url for url in urls if url}
+        keys.pop(None, None)
+        if not keys:
+            return {}
+        ready = db.execute(select(MediaObject.storage_key).where(
+            MediaObject.storage_key.in_(keys),
+            MediaObject.derivatives_ready.is_(True)
+        )).scalars()
+        return {keys[key]: storage.url(derivative_filename(key, variant)) for key in ready}
+
+    @staticmethod
+    def _register_legacy(db: Session, key: str) -> Optional[MediaObject]:
+        """Track a photo stored before content addressing; None if it can't be."""
+        storage = get_storage()
+        if not storage.exists(key):
+            return None
+        digest, size, head = hashlib.sha256(), 0, b""
+        with storage.open(key) as source:
+            while block := source.read(64 * 1024):
+                head = head or block[:SNIFF_BYTES]
+                digest.update(block)
+                size += len(block)
+        ext = sniff_image_type(head)
+        if not ext or db.query(MediaObject.id).filter(MediaObject.sha256 == digest.hexdigest()).first():
+            # Not an image, or a copy of content already tracked under its own key
+            return None
+        media = MediaObject(sha256=digest.hexdigest(), storage_key=key, content_type=CONTENT_TYPES[ext], size=size)
+        db.add(media)
+        db.commit()
+        return media
+
+    @staticmethod
+    def _build_derivatives(key: str):
+        """Generate and store `key`'s derivatives now, from a private copy of the original."""
+        storage = get_storage()
+        staging = tempfile.mkdtemp(prefix="derivatives-")
+        try:
+            source_path = os.path.join(staging, os.path.basename(key))
+            with storage.open(key) as source, open(source_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            store_derivatives(key, submit_to_process_pool(make_derivatives, source_path).result())
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @staticmethod
+    def backfill_derivatives(db: Session, limit: int = 200) -> dict:
+        """
+        Bring existing photos up to date: register legacy uploads that students
+        reference as MediaObjects, then flag (or build, up to `limit`) the
+        derivatives of every object not yet marked ready. Rerun until
+        `remaining` is 0; objects that failed are retried on the next run.
+        """
+        storage = get_storage()
+        result = {"registered": 0, "marked": 0, "generated": 0, "failed": 0, "remaining": 0}
+
+        referenced = sorted(MediaService.referenced_keys(db))
+        known = set()
+        for start in range(0, len(referenced), 1000):
+            chunk = referenced[start:start + 1000]
+            known.update(db.execute(select(MediaObject.storage_key).where(MediaObject.storage_key.in_(chunk))).scalars())
+        for key in referenced:
+            if key in known:
+                continue
+            try:
+                if MediaService._register_legacy(db, key):
+                    result["registered"] += 1
+            except Exception:
+                db.rollback()
+                logger.exception(f"Failed to register legacy media {key}")
+
+        pending = db.execute(
+            select(MediaObject.storage_key).where(MediaObject.derivatives_ready.is_(False))
+            .order_by(MediaObject.id).limit(limit)
+        ).scalars().all()
+        for key in pending:
+            if all(storage.exists(derivative_filename(key, variant)) for variant in DERIVATIVE_SIZES):
+                media = db.query(MediaObject).filter(MediaObject.storage_key == key).one()
+                media.derivatives_ready = True
+                db.commit()
+                result["marked"] += 1
+                continue
+            if not derivatives_enabled():
+                continue
+            try:
+                MediaService._build_derivatives(key)
+                result["generated"] += 1
+            except Exception:
+                logger.exception(f"Failed to build derivatives for {key}")
+                result["failed"] += 1
+
+        result["remaining"] = db.query(func.count(MediaObject.id)).filter(MediaObject.derivatives_ready.is_(False)).scalar()
+        return result
+
+    @staticmethod
+    def collect_garbage(db: Session, dry_run: bool = True) -> dict:
+        """
+        Delete stored media (and derivatives) that no student photo references
+        and that nobody uploaded within MEDIA_GC_GRACE_HOURS.
+        """
+        storage = get_storage()
+        referenced = MediaService.referenced_keys(db)
+        cutoff = datetime.utcnow() - timedelta(hours=settings.MEDIA_GC_GRACE_HOURS)
+
+        candidates = db.query(MediaObject).filter(MediaObject.last_uploaded_at < cutoff).all()
+        orphans = [media for media in candidates if media.storage_key not in referenced]
+        result = {
+            "dry_run": dry_run,
+            "scanned": len(candidates),
+            "orphaned": len(orphans),
+            "deleted": 0,
+            "freed_bytes": sum(media.size for media in orphans),
+        }
+        if dry_run or not orphans:
+            return result
+
+        result["freed_bytes"] = 0
+
+        for media in orphans:
+            try:
+                for key in [media.storage_key, *derivative_keys(media.storage_key).values()]:
+                    storage.delete(key)
+            except Exception:
+                logger.exception(f"Failed to delete media {media.storage_key}")
+                continue
+            db.delete(media)
+            result["deleted"] += 1
+            result["freed_bytes"] += media.size
+        db.commit()
+        return result
@@ -0,0 +1,80 @@
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.core.config import settings
+from .images import CONTENT_TYPES
+from .storage import get_storage
+
+router = APIRouter()
+
+# ab/cd/<sha256>[_variant].<ext>: the name fixes the bytes, so it can be cached forever
+CONTENT_ADDRESSED_KEY = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/(?P<name>[0-9a-f]{64}(?:_[a-z]+)?)\.[a-z]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Legacy uuid uploads are never rewritten either, but carry no content hash
+LEGACY_CACHE_CONTROL = "public, max-age=86400"
+STREAM_BLOCK_SIZE = 64 * 1024
+
+def _content_type(key: str) -> str:
+    content_type = CONTENT_TYPES.get(os.path.splitext(key)[1].lower()) or mimetypes.guess_type(key)[0]
+    return content_type or "application/octet-stream"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def _cache_headers(key: str, path: Optional[str]) -> Dict[str, str]:
+    match = CONTENT_ADDRESSED_KEY.match(key)
+    if match:
+        return {"ETag": f'"{match.group("name")}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if path:
+        stat = os.stat(path)
+        digest = hashlib.md5(f"{stat.st_mtime_ns}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest()
+        return {"ETag": f'"{digest}"', "Cache-Control": LEGACY_CACHE_CONTROL}
+    return {"Cache-Control": LEGACY_CACHE_CONTROL}
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(key: str, request: Request):
+    # Nothing outside stored objects: no dotfiles, staging area or traversal
+    if not key or any(part.startswith(".") or not part for part in key.split("/")):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    storage = get_storage()
+    path = storage.local_path(key)
+    if path is not None and not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    headers = _cache_headers(key, path)
+    if "ETag" in headers and _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if path is not None:
+        if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+            # nginx sends the file (and handles Range) from an internal location
+            headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + key
+            return Response(headers=headers, media_type=_content_type(key))
+        # FileResponse answers Range / If-Range with 206 using our ETag
+        return FileResponse(path, headers=headers, media_type=_content_type(key))
+
+    if not await run_in_threadpool(storage.exists, key):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    def iter_object():
+        body = storage.open(key)
+        try:
+            while block := body.read(STREAM_BLOCK_SIZE):
+                yield block
+        finally:
+            body.close()
+
+    return StreamingResponse(iter_object(), headers=headers, media_type=_content_type(key))
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator, Optional
+from app.core.config import settings
+
+def content_key(sha256: str, ext: str) -> str:
+    """Storage key for content with digest `sha256`, sharded two levels deep."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+class StorageBackend(ABC):
+    """
+    Where media bytes live. Keys are relative, '/'-separated paths such as
+    the ones content_key builds; `save` copies, leaving `source_path` in place.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def save(self, key: str, source_path: str, content_type: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def iter_keys(self, prefix: str = "") -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        """Inverse of `url`, or None for URLs this backend did not issue."""
+        base = self.url("")
+        if url and url.startswith(base) and len(url) > len(base):
+            return url[len(base):]
+        return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of `key` when the backend keeps it on local disk."""
+        return None
+
+class LocalStorageBackend(StorageBackend):
+    """Files under `root`, published through the StaticFiles mount at MEDIA_URL."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/") + "/"
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save(self, key: str, source_path: str, content_type: Optional[str] = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique partial file beside the target, so concurrent saves of the
+        # same key (from any thread or worker) never write into each other
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target, open(source_path, "rb") as source:
+                shutil.copyfileobj(source, target)
+            # mkstemp creates it owner-only; media is served to everyone
+            os.chmod(partial, 0o644)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_keys(self, prefix: str = "") -> Iterator[str]:
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, prefix)):
+            for filename in filenames:
+                yield os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/")
+
+    def url(self, key: str) -> str:
+        return self.base_url + key
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+class S3StorageBackend(StorageBackend):
+    """
+    Objects in an S3-compatible bucket through a boto3-style client, so
+    MinIO or any local S3 stand-in works by pointing the client at it.
+    """
+
+    def __init__(self, client, bucket: str, base_url: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.base_url = base_url.rstrip("/") + "/"
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def exists(self, key: str) -> bool:
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=self._object_key(key), MaxKeys=1)
+        return any(obj["Key"] == self._object_key(key) for obj in response.get("Contents", []))
+
+    def save(self, key: str, source_path: str, content_type: Optional[str] = None):
+        extra = {"ContentType": content_type} if content_type else {}
+        with open(source_path, "rb") as source:
+            self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=source, **extra)
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def iter_keys(self, prefix: str = "") -> Iterator[str]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix):]
+
+    def url(self, key: str) -> str:
+        return self.base_url + key
+
+def create_storage_backend() -> StorageBackend:
+    if settings.MEDIA_STORAGE_BACKEND == "s3":
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requires the 'boto3' package")
+        if not settings.MEDIA_S3_BUCKET:
+            raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requires MEDIA_S3_BUCKET")
+        client = boto3.client("s3", endpoint_url=settings.MEDIA_S3_ENDPOINT_URL)
+        return S3StorageBackend(
+            client,
+            settings.MEDIA_S3_BUCKET,
+            base_url=settings.MEDIA_S3_PUBLIC_URL or settings.MEDIA_URL,
+            prefix=settings.MEDIA_S3_PREFIX
+        )
+    return LocalStorageBackend(os.path.join(os.getcwd(), settings.UPLOAD_DIR), settings.MEDIA_URL)
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage_backend()
+    return _storage
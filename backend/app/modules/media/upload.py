@@ -0,0 +1,153 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional
+from fastapi import HTTPException, Request, status
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+
+# Room for the boundary and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+SNIFF_BYTES = 16
+
+class UploadTooLarge(Exception):
+    pass
+
+@dataclass
+class ReceivedUpload:
+    path: str
+    size: int
+    filename: Optional[str]
+    head: bytes
+    sha256: str = ""
+
+class _FileFieldReader:
+    """
+    python-multipart callbacks that write one file field straight to disk,
+    counting bytes as they arrive and raising UploadTooLarge past the limit.
+    Other fields are ignored.
+    """
+
+    def __init__(self, field_name: str, dest_dir: str, max_size: int):
+        self.field_name = field_name
+        self.dest_dir = dest_dir
+        self.max_size = max_size
+        self.headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._file = None
+        self._digest = None
+        self.upload: Optional[ReceivedUpload] = None
+
+    def on_part_begin(self):
+        self.headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        if name != self.field_name or b"filename" not in options or self.upload:
+            return
+        self._file = tempfile.NamedTemporaryFile(dir=self.dest_dir, suffix=".part", delete=False)
+        self._digest = hashlib.sha256()
+        self.upload = ReceivedUpload(
+            path=self._file.name, size=0, filename=options[b"filename"].decode("utf-8", "replace"), head=b""
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._file:
+            return
+        chunk = data[start:end]
+        self.upload.size += len(chunk)
+        if self.upload.size > self.max_size:
+            raise UploadTooLarge()
+        if len(self.upload.head) < SNIFF_BYTES:
+            self.upload.head += chunk[:SNIFF_BYTES - len(self.upload.head)]
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def on_part_end(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self.upload.sha256 = self._digest.hexdigest()
+
+    def discard(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.upload and os.path.exists(self.upload.path):
+            os.remove(self.upload.path)
+        self.upload = None
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_size // 1024} KB"
+    )
+
+async def receive_upload(request: Request, dest_dir: str, max_size: int, field_name: str = "file") -> ReceivedUpload:
+    """
+    Stream the `field_name` file of a multipart request into a temporary file
+    in `dest_dir`, hashing it on the way. Unlike UploadFile, nothing is spooled first: the request is
+    refused from Content-Length, or abandoned as soon as the file passes
+    `max_size` or the whole body passes it plus MULTIPART_OVERHEAD, so
+    oversized uploads cost at most that many bytes of I/O.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise _too_large(max_size)
+
+    reader = _FileFieldReader(field_name, dest_dir, max_size)
+    parser = MultipartParser(params[b"boundary"], reader.callbacks())
+    # Chunked requests declare no length: bound the whole body, so other
+    # parts and part headers can't be streamed in without limit either
+    max_body = max_size + MULTIPART_OVERHEAD
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise UploadTooLarge()
+            parser.write(chunk)
+        parser.finalize()
+    except UploadTooLarge:
+        reader.discard()
+        raise _too_large(max_size)
+    except FormParserError:
+        reader.discard()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid multipart data")
+    except BaseException:
+        reader.discard()
+        raise
+
+    if not reader.upload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Missing file field '{field_name}'")
+    return reader.upload
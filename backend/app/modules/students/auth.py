@@ -0,0 +1,89 @@
+import time
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt, JWTError
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.session import get_db
+from .models import Student, StudentAccount
+
+reusable_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/students/login"
+)
+
+@dataclass(frozen=True)
+class StudentPrincipal:
+    student_id: int
+    username: str
+    is_active: bool
+
+@dataclass(frozen=True)
+class StudentClaims:
+    student_id: int
+    username: str
+    expires_at: float
+
+# Per worker: forget_student_principal only clears this process, so the TTL
+# also bounds how long other workers can serve a stale account state.
+principal_cache = TTLCache(
+    maxsize=settings.STUDENT_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.STUDENT_PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def forget_student_principal(student_id: int):
+    """Call after a password change, reset or (de)activation of the account."""
+    principal_cache.pop(student_id)
+
+def get_student_claims(token: str = Depends(reusable_oauth2)) -> StudentClaims:
+    credentials_error = HTTPException(status_code=401, detail="Could not validate credentials")
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        raise credentials_error
+
+    username = payload.get("sub")
+    student_id = payload.get("id")
+    if username is None or not isinstance(student_id, int) or payload.get("type") != "student":
+        raise credentials_error
+    return StudentClaims(student_id=student_id, username=username, expires_at=payload["exp"])
+
+def get_current_student_id(claims: StudentClaims = Depends(get_student_claims)) -> int:
+    """Identity from the signed token alone, for endpoints that only need the id."""
+    return claims.student_id
+
+def get_current_principal(
+    claims: StudentClaims = Depends(get_student_claims),
+    db: Session = Depends(get_db)
+) -> StudentPrincipal:
+    principal = principal_cache.get(claims.student_id)
+    if principal is None:
+        account = db.query(StudentAccount.username, StudentAccount.is_active).filter(
+            StudentAccount.student_id == claims.student_id
+        ).first()
+        if not account:
+            raise HTTPException(status_code=404, detail="Student not found")
+        principal = StudentPrincipal(
+            student_id=claims.student_id, username=account.username, is_active=bool(account.is_active)
+        )
+        ttl = min(settings.STUDENT_PRINCIPAL_CACHE_TTL_SECONDS, claims.expires_at - time.time())
+        if ttl > 0:
+            principal_cache.set(claims.student_id, principal, ttl=ttl)
+
+    if principal.username != claims.username:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if not principal.is_active:
+        raise HTTPException(status_code=401, detail="Account is inactive. Please contact admin.")
+    return principal
+
+def get_current_student(
+    principal: StudentPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> Student:
+    student = db.get(Student, principal.student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student
@@ -1,10 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Date, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 import enum
 from typing import Optional
 from datetime import datetime
 from app.db.base_class import Base
-from ..admissions.models import AdmissionStatus
+from ..admissions.models import AdmissionStatus # noqa: registers Admission for relationships
 
 class Gender(str, enum.Enum):
     Male = "Male"
@@ -28,70 +28,62 @@ class Student(Base):
     date_of_birth = Column(Date, nullable=False)
     nationality = Column(String, nullable=False)
     address = Column(Text, nullable=True)
-    city = Column(String, nullable=True)
+    city = Column(String, nullable=True, index=True)
     photo = Column(String, nullable=True) # File path
     ghana_card = Column(String, nullable=True)
     disability_status = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Current enrollment, denormalized from admissions by
+    # StudentService.refresh_current_enrollment whenever an admission changes
+    current_academic_year_id = Column(Integer, ForeignKey("academicyear.id"), nullable=True, index=True)
+    current_class_id = Column(Integer, ForeignKey("classroom.id"), nullable=True, index=True)
+    current_stream_id = Column(Integer, ForeignKey("stream.id"), nullable=True, index=True)
+    pending_admission_id = Column(Integer, nullable=True)
+    enrollment_status = Column(String, nullable=False, default="Inactive", index=True)
+
     guardians = relationship("Guardian", back_populates="student", cascade="all, delete-orphan")
     medical = relationship("StudentMedical", back_populates="student", uselist=False, cascade="all, delete-orphan")
     account = relationship("StudentAccount", back_populates="student", uselist=False, cascade="all, delete-orphan")
     admissions = relationship("Admission", back_populates="student")
 
+    enrolled_academic_year = relationship("AcademicYear", lazy="joined")
+    enrolled_class = relationship("ClassRoom", lazy="joined")
+    enrolled_stream = relationship("Stream", lazy="joined")
+
+    __table_args__ = (
+        # Trigram indexes for ILIKE '%term%' name search (requires pg_trgm)
+        Index("ix_student_first_name_trgm", "first_name", postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}),
+        Index("ix_student_last_name_trgm", "last_name", postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}),
+        # Directory sort orders, plus the class roster view
+        Index("ix_student_last_name_first_name_id", "last_name", "first_name", "id"),
+        Index("ix_student_created_at_id", "created_at", "id"),
+        Index("ix_student_current_class_id_last_name_first_name_id", "current_class_id", "last_name", "first_name", "id"),
+    )
+
     @property
     def current_class(self) -> str:
-        # Get latest approved admission
-        if not self.admissions: return "N/A"
-        latest_adm = next((a for a in sorted(self.admissions, key=lambda x: x.created_at, reverse=True) 
-                          if a.status == "Approved"), None)
-        return latest_adm.class_room.name if latest_adm else "N/A"
+        return self.enrolled_class.name if self.enrolled_class else "N/A"
 
     @property
     def class_id(self) -> Optional[int]:
-        if not self.admissions: return None
-        latest_adm = next((a for a in sorted(self.admissions, key=lambda x: x.created_at, reverse=True) 
-                          if a.status == "Approved"), None)
-        return latest_adm.class_id if latest_adm else None
+        return self.current_class_id
 
     @property
     def stream_id(self) -> Optional[int]:
-        if not self.admissions: return None
-        latest_adm = next((a for a in sorted(self.admissions, key=lambda x: x.created_at, reverse=True) 
-                          if a.status == "Approved"), None)
-        return latest_adm.stream_id if latest_adm else None
+        return self.current_stream_id
 
     @property
     def current_stream(self) -> str:
-        if not self.admissions: return "N/A"
-        latest_adm = next((a for a in sorted(self.admissions, key=lambda x: x.created_at, reverse=True) 
-                          if a.status == "Approved"), None)
-        return latest_adm.stream.name if latest_adm and latest_adm.stream else "N/A"
+        return self.enrolled_stream.name if self.enrolled_stream else "N/A"
 
     @property
     def status(self) -> str:
-        if not self.admissions: return "Inactive"
-        # Check if there's any approved admission
-        has_approved = any(a.status == AdmissionStatus.Approved for a in self.admissions)
-        if has_approved:
-            return "Active"
-        # Check for pending
-        if any(a.status == AdmissionStatus.Pending for a in self.admissions):
-            return "Pending Approval"
-        return "Inactive"
-
-    @property
-    def pending_admission_id(self) -> Optional[int]:
-        if not self.admissions: return None
-        pending = next((a for a in self.admissions if a.status == AdmissionStatus.Pending), None)
-        return pending.id if pending else None
+        return self.enrollment_status or "Inactive"
 
     @property
     def admission_year(self) -> str:
-        if not self.admissions: return "N/A"
-        latest_adm = next((a for a in sorted(self.admissions, key=lambda x: x.created_at, reverse=True) 
-                          if a.status == "Approved"), None)
-        return latest_adm.academic_year_name if latest_adm else "N/A"
+        return self.enrolled_academic_year.name if self.enrolled_academic_year else "N/A"
 
 class Guardian(Base):
     id = Column(Integer, primary_key=True, index=True)
@@ -117,7 +109,7 @@ class StudentMedical(Base):
 
 class StudentAccount(Base):
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("student.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student.id", ondelete="CASCADE"), nullable=False, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     must_change_password = Column(Boolean, default=True)
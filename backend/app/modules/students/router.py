@@ -1,69 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.session import get_db
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Literal, Optional
+from app.core.constants import MAX_PAGE_SIZE
+from app.core.profiling import query_budget
+from app.core.proxy import client_ip
+from app.db.session import get_async_db, get_db
 from . import schemas, models
+from .auth import (
+    StudentClaims, forget_student_principal, get_current_student, get_current_student_id, get_student_claims
+)
+from .service import StudentService
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.core.config import settings
-from jose import jwt, JWTError
 
 router = APIRouter()
 
-reusable_oauth2 = OAuth2PasswordBearer(
-    tokenUrl=f"{settings.API_V1_STR}/students/login"
-)
-
-def get_current_student(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> models.Student:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Could not validate credentials")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
-    
-    student = db.query(models.Student).filter(
-        models.Student.account.has(username=username)
-    ).first()
-    
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    return student
-
 @router.post("/login", response_model=schemas.Token)
 def student_login(
     obj_in: schemas.StudentLogin,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    # Search by index_number OR username
-    student = db.query(models.Student).filter(
-        (models.Student.index_number == obj_in.username) |
-        (models.Student.account.has(username=obj_in.username))
-    ).first()
-
-    if not student or not student.account:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    if not student.account.is_active:
-        raise HTTPException(status_code=401, detail="Account is inactive. Please contact admin.")
-
-    if not verify_password(obj_in.password, student.account.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Identifier can be the index_number or the generated username
+    account = StudentService.authenticate(db, obj_in.username, obj_in.password, client_ip(request))
+    student = account.student
 
     access_token = create_access_token(
-        data={"sub": student.account.username, "id": student.id, "type": "student"}
+        data={"sub": account.username, "id": student.id, "type": "student"}
     )
     
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "must_change_password": student.account.must_change_password,
+        "must_change_password": account.must_change_password,
         "student_name": f"{student.first_name} {student.last_name}",
         "index_number": student.index_number or "N/A"
     }
@@ -71,23 +42,45 @@ def student_login(
 @router.post("/change-password")
 def change_password(
     obj_in: schemas.StudentPasswordChange,
-    current_student: models.Student = Depends(get_current_student),
+    student_id: int = Depends(get_current_student_id),
     db: Session = Depends(get_db)
 ):
-    if not verify_password(obj_in.current_password, current_student.account.hashed_password):
+    account = db.query(models.StudentAccount).filter(models.StudentAccount.student_id == student_id).first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if not verify_password(obj_in.current_password, account.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect current password")
     
-    current_student.account.hashed_password = get_password_hash(obj_in.new_password)
-    current_student.account.must_change_password = False
+    account.hashed_password = get_password_hash(obj_in.new_password)
+    account.must_change_password = False
     
     db.commit()
+    forget_student_principal(student_id)
     return {"message": "Password changed successfully", "success": True}
 
-@router.get("/me/profile", response_model=schemas.StudentResponse)
-def get_my_profile(
-    current_student: models.Student = Depends(get_current_student)
+@router.get("/me/profile", response_model=schemas.StudentResponse, dependencies=[Depends(query_budget(2))])
+async def get_my_profile(
+    claims: StudentClaims = Depends(get_student_claims),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return current_student
+    # Same loading as get_student; the account it loads also stands in for
+    # get_current_principal's username and is_active checks
+    student = (await db.execute(
+        select(models.Student)
+        .options(
+            selectinload(models.Student.guardians),
+            joinedload(models.Student.medical),
+            joinedload(models.Student.account)
+        )
+        .where(models.Student.id == claims.student_id)
+    )).unique().scalars().first()
+    if not student or not student.account:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if student.account.username != claims.username:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if not student.account.is_active:
+        raise HTTPException(status_code=401, detail="Account is inactive. Please contact admin.")
+    return student
 
 @router.patch("/me/profile", response_model=schemas.StudentResponse)
 def update_my_profile(
@@ -111,7 +104,7 @@ def update_my_profile(
     db.refresh(current_student)
     return current_student
 
-@router.get("/", response_model=List[schemas.StudentResponse])
+@router.get("/", response_model=List[schemas.StudentResponse], dependencies=[Depends(query_budget(4))])
 def list_students(
     search: Optional[str] = None,
     status: Optional[str] = None,
@@ -119,13 +112,11 @@ def list_students(
     class_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    from sqlalchemy.orm import joinedload
-    from app.modules.admissions.models import Admission, AdmissionStatus
-    
+    # StudentResponse nests guardians, medical and account for every row
     query = db.query(models.Student).options(
-        joinedload(models.Student.admissions).joinedload(Admission.class_room),
-        joinedload(models.Student.admissions).joinedload(Admission.academic_year),
-        joinedload(models.Student.admissions).joinedload(Admission.stream)
+        selectinload(models.Student.guardians),
+        selectinload(models.Student.medical),
+        selectinload(models.Student.account)
     )
 
     if search:
@@ -136,30 +127,64 @@ def list_students(
             (models.Student.index_number.ilike(search_filter))
         )
 
-    # Note: Status, Academic Year, and Class filtering requires joining with Admissions
-    if any([status, academic_year_id, class_id]):
-        query = query.join(models.Student.admissions)
-        
-        if status:
-            if status.title() == "Active":
-                query = query.filter(Admission.status == AdmissionStatus.Approved)
-            else: # Assuming any other status implies PENDING
-                query = query.filter(Admission.status == AdmissionStatus.Pending)
-        
-        if academic_year_id:
-            query = query.filter(Admission.academic_year_id == academic_year_id)
-        
-        if class_id:
-            query = query.filter(Admission.class_id == class_id)
+    # Status, Academic Year and Class filter on the denormalized current enrollment
+    if status:
+        if status.title() == "Active":
+            query = query.filter(models.Student.enrollment_status == "Active")
+        else: # Assuming any other status implies PENDING
+            query = query.filter(models.Student.enrollment_status == "Pending Approval")
+
+    if academic_year_id:
+        query = query.filter(models.Student.current_academic_year_id == academic_year_id)
+
+    if class_id:
+        query = query.filter(models.Student.current_class_id == class_id)
 
     return query.all()
 
-@router.get("/{student_id}", response_model=schemas.StudentResponse)
-def get_student(
-    student_id: int,
+@router.get("/directory", response_model=schemas.PaginatedStudentDirectory)
+def student_directory(
+    search: Optional[str] = None,
+    status: Optional[Literal["Active", "Pending Approval", "Inactive"]] = None,
+    academic_year_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    stream_id: Optional[int] = None,
+    gender: Optional[models.Gender] = None,
+    city: Optional[str] = None,
+    sort: Literal["name", "newest"] = "name",
+    cursor: Optional[str] = None,
+    size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    return StudentService.list_directory(
+        db,
+        search=search,
+        status=status,
+        academic_year_id=academic_year_id,
+        class_id=class_id,
+        stream_id=stream_id,
+        gender=gender,
+        city=city,
+        sort=sort,
+        cursor=cursor,
+        size=size
+    )
+
+@router.get("/{student_id}", response_model=schemas.StudentResponse, dependencies=[Depends(query_budget(2))])
+async def get_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Everything StudentResponse reads must be loaded up front on an AsyncSession
+    student = (await db.execute(
+        select(models.Student)
+        .options(
+            selectinload(models.Student.guardians),
+            joinedload(models.Student.medical),
+            joinedload(models.Student.account)
+        )
+        .where(models.Student.id == student_id)
+    )).unique().scalars().first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
@@ -193,6 +218,7 @@ def update_student(
             if stream_id is not None:
                 latest_adm.stream_id = stream_id
             db.add(latest_adm)
+            StudentService.refresh_current_enrollment(db, [student_id])
 
     for field, value in update_data.items():
         setattr(student, field, value)
@@ -215,4 +241,5 @@ def reset_student_password(
     student.account.must_change_password = True
     
     db.commit()
+    forget_student_principal(student.id)
     return {"message": "Password reset successfully", "success": True}
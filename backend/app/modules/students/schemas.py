@@ -139,3 +139,26 @@ class StudentResponse(StudentBase):
 
     class Config:
         from_attributes = True
+
+class StudentListItem(BaseModel):
+    id: int
+    index_number: Optional[str] = None
+    first_name: str
+    middle_name: Optional[str] = None
+    last_name: str
+    gender: Gender
+    city: Optional[str] = None
+    photo: Optional[str] = None
+    photo_thumbnail: Optional[str] = None
+    status: str
+    academic_year_id: Optional[int] = None
+    admission_year: str = "N/A"
+    class_id: Optional[int] = None
+    current_class: str = "N/A"
+    stream_id: Optional[int] = None
+    current_stream: str = "N/A"
+
+class PaginatedStudentDirectory(BaseModel):
+    items: List[StudentListItem]
+    next_cursor: Optional[str] = None
+    size: int
@@ -1 +1,216 @@
-# Placeholder for service.py in students module
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from sqlalchemy import case, exists, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor, escape_like
+from app.core.security import verify_and_update_password
+from app.core.throttling import Throttle, create_throttle_store
+from .models import Student, StudentAccount, Gender
+from ..media.service import MediaService
+from ..admissions.models import Admission, AdmissionStatus
+from ..academics.models import AcademicYear, ClassRoom, Stream
+
+# Directory sort options: (sort key columns, descending). Every key ends
+# in Student.id so keyset cursors are unique; each has a matching index.
+DIRECTORY_SORTS = {
+    "name": ((Student.last_name, Student.first_name, Student.id), False),
+    "newest": ((Student.created_at, Student.id), True),
+}
+
+def _latest_admission(column, status: AdmissionStatus):
+    return select(column).where(
+        Admission.student_id == Student.id,
+        Admission.status == status
+    ).order_by(Admission.created_at.desc(), Admission.id.desc()).limit(1).scalar_subquery()
+
+# Failed logins per client IP and per resolved account
+throttle_store = create_throttle_store()
+login_ip_throttle = Throttle(
+    throttle_store, "student-login-ip",
+    settings.STUDENT_LOGIN_IP_LIMIT, settings.STUDENT_LOGIN_WINDOW_SECONDS
+)
+login_account_throttle = Throttle(
+    throttle_store, "student-login-account",
+    settings.STUDENT_LOGIN_ACCOUNT_LIMIT, settings.STUDENT_LOGIN_WINDOW_SECONDS
+)
+
+def _too_many_attempts() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts. Please try again later.",
+        headers={"Retry-After": str(settings.STUDENT_LOGIN_WINDOW_SECONDS)}
+    )
+
+class StudentService:
+    @staticmethod
+    def find_account(db: Session, identifier: str) -> Optional[StudentAccount]:
+        """Resolve a login identifier (username or index number) with two unique-index lookups."""
+        account = db.query(StudentAccount).filter(StudentAccount.username == identifier).first()
+        if account:
+            return account
+        return db.query(StudentAccount).join(Student, StudentAccount.student_id == Student.id) \
+            .filter(Student.index_number == identifier).first()
+
+    @staticmethod
+    def authenticate(db: Session, identifier: str, password: str, ip_address: Optional[str]) -> StudentAccount:
+        # Throttled clients and accounts are turned away before any hashing
+        if login_ip_throttle.is_limited(ip_address):
+            raise _too_many_attempts()
+
+        account = StudentService.find_account(db, identifier)
+        if not account:
+            login_ip_throttle.hit(ip_address)
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        account_key = str(account.id)
+        if login_account_throttle.is_limited(account_key):
+            raise _too_many_attempts()
+
+        if not account.is_active:
+            raise HTTPException(status_code=401, detail="Account is inactive. Please contact admin.")
+
+        valid, new_hash = verify_and_update_password(password, account.hashed_password)
+        if not valid:
+            login_ip_throttle.hit(ip_address)
+            login_account_throttle.hit(account_key)
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        login_account_throttle.reset(account_key)
+        if new_hash:
+            # Stored hash predates the current PASSWORD_HASH_ROUNDS
+            account.hashed_password = new_hash
+            db.commit()
+        return account
+
+    @staticmethod
+    def refresh_current_enrollment(db: Session, student_ids: Iterable[int]):
+        """
+        Recompute the denormalized current-enrollment columns from admissions
+        with one set-based UPDATE. Call after any admission insert or change,
+        before committing.
+        """
+        student_ids = list(set(student_ids))
+        if not student_ids:
+            return
+
+        # Pending ORM changes to admissions must be visible to the subqueries
+        db.flush()
+        has_approved = exists().where(Admission.student_id == Student.id, Admission.status == AdmissionStatus.Approved)
+        has_pending = exists().where(Admission.student_id == Student.id, Admission.status == AdmissionStatus.Pending)
+
+        db.execute(
+            update(Student).where(Student.id.in_(student_ids)).values(
+                current_academic_year_id=_latest_admission(Admission.academic_year_id, AdmissionStatus.Approved),
+                current_class_id=_latest_admission(Admission.class_id, AdmissionStatus.Approved),
+                current_stream_id=_latest_admission(Admission.stream_id, AdmissionStatus.Approved),
+                pending_admission_id=_latest_admission(Admission.id, AdmissionStatus.Pending),
+                enrollment_status=case(
+                    (has_approved, "Active"),
+                    (has_pending, "Pending Approval"),
+                    else_="Inactive"
+                )
+            ).execution_options(synchronize_session=False)
+        )
+
+        # Objects already in the session still hold the old values
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, Student) and obj.id in student_ids:
+                db.expire(obj)
+
+    @staticmethod
+    def list_directory(
+        db: Session,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        academic_year_id: Optional[int] = None,
+        class_id: Optional[int] = None,
+        stream_id: Optional[int] = None,
+        gender: Optional[Gender] = None,
+        city: Optional[str] = None,
+        sort: str = "name",
+        cursor: Optional[str] = None,
+        size: int = 50
+    ) -> dict:
+        """
+        Keyset-paginated student directory. All filters apply to student
+        columns (including the denormalized current enrollment) so each page
+        is a single query with three many-to-one joins for display names.
+        """
+        query = db.query(
+            Student.id,
+            Student.index_number,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Student.gender,
+            Student.city,
+            Student.photo,
+            Student.enrollment_status,
+            Student.current_academic_year_id,
+            Student.current_class_id,
+            Student.current_stream_id,
+            Student.created_at,
+            AcademicYear.name.label("academic_year_name"),
+            ClassRoom.name.label("class_name"),
+            Stream.name.label("stream_name")
+        ).outerjoin(AcademicYear, Student.current_academic_year_id == AcademicYear.id) \
+         .outerjoin(ClassRoom, Student.current_class_id == ClassRoom.id) \
+         .outerjoin(Stream, Student.current_stream_id == Stream.id)
+
+        if search:
+            pattern = f"%{escape_like(search)}%"
+            query = query.filter(or_(
+                Student.first_name.ilike(pattern, escape="\\"),
+                Student.last_name.ilike(pattern, escape="\\"),
+                Student.index_number.ilike(pattern, escape="\\")
+            ))
+        if status:
+            query = query.filter(Student.enrollment_status == status)
+        if academic_year_id:
+            query = query.filter(Student.current_academic_year_id == academic_year_id)
+        if class_id:
+            query = query.filter(Student.current_class_id == class_id)
+        if stream_id:
+            query = query.filter(Student.current_stream_id == stream_id)
+        if gender:
+            query = query.filter(Student.gender == gender)
+        if city:
+            query = query.filter(Student.city == city)
+
+        sort_columns, descending = DIRECTORY_SORTS[sort]
+        sort_key = tuple_(*sort_columns)
+        after = decode_cursor(cursor, [c.type.python_type for c in sort_columns])
+        if after:
+            query = query.filter(sort_key < tuple(after) if descending else sort_key > tuple(after))
+
+        order_by = [c.desc() if descending else c.asc() for c in sort_columns]
+        rows = query.order_by(*order_by).limit(size + 1).all()
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in sort_columns])
+
+        thumbnails = MediaService.derivative_urls(db, (row.photo for row in rows), "thumb")
+        items = [
+            {
+                "id": row.id,
+                "index_number": row.index_number,
+                "first_name": row.first_name,
+                "middle_name": row.middle_name,
+                "last_name": row.last_name,
+                "gender": row.gender,
+                "city": row.city,
+                "photo": row.photo,
+                "photo_thumbnail": thumbnails.get(row.photo),
+                "status": row.enrollment_status,
+                "academic_year_id": row.current_academic_year_id,
+                "admission_year": row.academic_year_name or "N/A",
+                "class_id": row.current_class_id,
+                "current_class": row.class_name or "N/A",
+                "stream_id": row.current_stream_id,
+                "current_stream": row.stream_name or "N/A"
+            }
+            for row in rows
+        ]
+        return {"items": items, "next_cursor": next_cursor, "size": size}
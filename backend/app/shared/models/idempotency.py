@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from app.db.base_class import Base
+
+class IdempotencyKey(Base):
+    """
+    A claimed Idempotency-Key and, once the request succeeds, the response to
+    replay to retries. Rows without a status code are still in progress.
+    """
+    id = Column(Integer, primary_key=True)
+    key = Column(String(64), unique=True, index=True, nullable=False) # sha256 of scope + client key
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,182 @@
+"""
+Drive the admissions funnel against a running server, the way applicants
+and the admissions office use it:
+
+    verify     POST /evoucher/verify
+    session    GET  /evoucher/check-session/{token}
+    submit     POST /admissions/
+    approve    POST /admissions/{id}/approve
+
+Each journey takes one unused voucher from the manifest written by
+benchmarks.seed_admissions. `--concurrency` journeys run at once. The
+report gives throughput and latency percentiles per step, plus the mean
+SQL statement count when the server runs with SQL_PROFILER_ENABLED.
+
+    python -m benchmarks.seed_admissions --year 2099/2100 --manifest funnel_seed.json
+    python -m benchmarks.admissions_funnel --manifest funnel_seed.json \\
+        --journeys 2000 --concurrency 32 --p95-budget submit=400
+
+Vouchers are used up by a run: pass `--offset` to continue into unused
+ones, or seed a fresh year. The exit status is 1 when any step failed
+or went over its --p95-budget, so it can gate a CI job.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+import httpx
+from benchmarks.reporting import latency_header, latency_row, percentile
+
+STEPS = ("verify", "session", "submit", "approve")
+
+class StepFailed(Exception):
+    pass
+
+class FunnelRecorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.failures = defaultdict(lambda: defaultdict(int))
+        self.journeys = []
+
+    async def call(self, step: str, request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            self.failures[step][type(e).__name__] += 1
+            raise StepFailed(step) from e
+        self.latencies[step].append((time.perf_counter() - started) * 1000)
+        if "x-sql-queries" in response.headers:
+            self.queries[step].append(int(response.headers["x-sql-queries"]))
+        if response.status_code >= 400:
+            self.failures[step][response.status_code] += 1
+            raise StepFailed(step)
+        return response
+
+def applicant(manifest: dict, rng: random.Random) -> dict:
+    room = rng.choice(manifest["classes"])
+    return {
+        "student": {
+            "first_name": rng.choice(["Ama", "Kofi", "Akosua", "Kwame", "Abena", "Yaw"]),
+            "last_name": rng.choice(["Mensah", "Owusu", "Boateng", "Asante", "Osei"]),
+            "gender": rng.choice(["male", "female"]),
+            "date_of_birth": "2013-05-01",
+            "nationality": "Ghanaian",
+            "city": "Accra",
+        },
+        "guardians": [{"name": "Bench Guardian", "relationship_type": "Mother", "phone": "0240000000", "address": "Accra"}],
+        "medical": {"allergies": "none"},
+        "placement": {
+            "academic_year_id": manifest["academic_year_id"],
+            "class_id": room["id"],
+            "stream_id": rng.choice(room["stream_ids"]),
+            "term_id": manifest["term_ids"][0],
+        },
+    }
+
+async def journey(client: httpx.AsyncClient, recorder: FunnelRecorder, manifest: dict, voucher: str, args, rng):
+    started = time.perf_counter()
+    try:
+        verified = (await recorder.call("verify", client.post(
+            "/evoucher/verify", json={"voucher_number": voucher, "pin": manifest["pin"]}
+        ))).json()
+        if not verified.get("valid"):
+            recorder.failures["verify"][verified.get("reason") or "invalid"] += 1
+            return
+        token = verified["voucher_session_token"]
+        await recorder.call("session", client.get(f"/evoucher/check-session/{token}"))
+        admission = (await recorder.call("submit", client.post(
+            "/admissions/", json={"voucher_session_token": token, **applicant(manifest, rng)}
+        ))).json()
+        if not args.skip_approve:
+            await recorder.call("approve", client.post(f"/admissions/{admission['id']}/approve"))
+    except StepFailed:
+        return
+    recorder.journeys.append((time.perf_counter() - started) * 1000)
+
+async def run(args, manifest: dict, vouchers: list) -> dict:
+    recorder = FunnelRecorder()
+    rng = random.Random(args.seed)
+    pending = iter(vouchers)
+    base_url = f"{args.base_url.rstrip('/')}{args.api_prefix}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        async def worker():
+            for voucher in pending:
+                await journey(client, recorder, manifest, voucher, args, rng)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "recorder": recorder}
+
+def parse_budgets(parser: argparse.ArgumentParser, values: list) -> dict:
+    budgets = {}
+    for value in values:
+        step, _, ms = value.partition("=")
+        try:
+            budgets[step] = float(ms)
+        except ValueError:
+            budgets[step] = None
+        if step not in STEPS or budgets[step] is None:
+            parser.error(f"--p95-budget expects STEP=MS with STEP one of {', '.join(STEPS)}")
+    return budgets
+
+def report(result: dict, args, budgets: dict) -> bool:
+    recorder, elapsed = result["recorder"], result["elapsed"]
+    ok = True
+    completed = len(recorder.journeys)
+    print(f"{completed}/{args.journeys} journeys completed in {elapsed:.2f}s "
+          f"({completed / elapsed:.1f} journeys/s), concurrency {args.concurrency}")
+    print(latency_header("step") + f" {'req/s':>8} {'sql':>6}")
+    for step in STEPS:
+        samples = recorder.latencies.get(step)
+        if not samples:
+            continue
+        queries = recorder.queries.get(step)
+        sql = f"{sum(queries) / len(queries):>6.1f}" if queries else f"{'-':>6}"
+        print(latency_row(step, samples) + f" {len(samples) / elapsed:>8.1f} {sql}")
+    if recorder.journeys:
+        print(latency_row("journey", recorder.journeys))
+
+    for step, failures in recorder.failures.items():
+        ok = False
+        print(f"  {step} failures: " + ", ".join(f"{reason}: {count}" for reason, count in failures.items()))
+    for step, budget in budgets.items():
+        samples = recorder.latencies.get(step)
+        if samples and percentile(samples, 95) > budget:
+            ok = False
+            print(f"  {step} p95 {percentile(samples, 95):.1f} ms is over its {budget:.0f} ms budget")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default="funnel_seed.json")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--journeys", type=int, default=1000)
+    parser.add_argument("--offset", type=int, default=0, help="skip this many manifest vouchers (used by earlier runs)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--skip-approve", action="store_true", help="stop at submission, leaving admissions pending")
+    parser.add_argument("--p95-budget", action="append", default=[], metavar="STEP=MS")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    budgets = parse_budgets(parser, args.p95_budget)
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    vouchers = manifest["vouchers"][args.offset:args.offset + args.journeys]
+    if len(vouchers) < args.journeys:
+        sys.exit(f"Only {len(vouchers)} unused vouchers left after offset {args.offset}; seed more")
+
+    result = asyncio.run(run(args, manifest, vouchers))
+    sys.exit(0 if report(result, args, budgets) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Concurrency check for IndexNumberAllocator.
+
+Hammers the allocator from many threads (each with its own session and
+transaction, like separate gunicorn workers) against the configured
+DATABASE_URL and verifies that every issued sequence value is unique and
+that together they form one gap-free range.
+
+    python -m benchmarks.index_number_concurrency --academic-year-id 1
+
+Uses a throwaway level code and removes its counter row afterwards.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from app.db import base # noqa
+from app.db.session import SessionLocal
+from app.modules.admissions.models import IndexNumberSequence
+from app.modules.admissions.service import IndexNumberAllocator
+
+def worker(academic_year_id: int, level_code: str, allocations: int, max_block: int, issued: list, errors: list):
+    for _ in range(allocations):
+        db = SessionLocal()
+        try:
+            count = random.randint(1, max_block)
+            first = IndexNumberAllocator.allocate(db, academic_year_id, level_code, count)
+            # Hold the transaction briefly to widen the race window
+            time.sleep(random.random() / 1000)
+            db.commit()
+            issued.extend(range(first, first + count))
+        except Exception as e:
+            db.rollback()
+            errors.append(e)
+        finally:
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--academic-year-id", type=int, required=True)
+    parser.add_argument("--level-code", default="ZZT")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--allocations", type=int, default=50, help="allocations per thread")
+    parser.add_argument("--max-block", type=int, default=5, help="largest block requested at once")
+    args = parser.parse_args()
+
+    issued, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(args.academic_year_id, args.level_code, args.allocations, args.max_block, issued, errors))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        db.query(IndexNumberSequence).filter(
+            IndexNumberSequence.academic_year_id == args.academic_year_id,
+            IndexNumberSequence.level_code == args.level_code
+        ).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    duplicates = len(issued) - len(set(issued))
+    gap_free = not issued or sorted(issued) == list(range(1, len(issued) + 1))
+    print(f"allocations: {args.threads * args.allocations} in {elapsed:.2f}s "
+          f"({args.threads * args.allocations / elapsed:.0f}/s)")
+    print(f"values issued: {len(issued)}, duplicates: {duplicates}, gap-free: {gap_free}, errors: {len(errors)}")
+    for e in errors[:5]:
+        print(f"  {type(e).__name__}: {e}")
+    if duplicates or not gap_free or errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Load test for POST /students/login against a running server.
+
+Fires `--requests` logins with `--concurrency` in flight and reports
+throughput and latency percentiles per response status. Run it once with
+the correct password (hashing cost) and once with `--wrong-password`
+to see throttled attempts answered with 429 before any hashing.
+
+    python -m benchmarks.login_load --base-url http://localhost:8001 \\
+        --username std_1_42 --password secret --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+import httpx
+from benchmarks.reporting import latency_header, latency_row
+
+async def run(args) -> dict:
+    url = f"{args.base_url.rstrip('/')}{args.api_prefix}/students/login"
+    body = {"username": args.username, "password": "wrong-" + args.password if args.wrong_password else args.password}
+    latencies = defaultdict(list)
+    remaining = args.requests
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    status = (await client.post(url, json=body)).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies[status].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "latencies": latencies}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--username", required=True, help="username or index number")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--wrong-password", action="store_true", help="send a bad password to exercise throttling")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    total = sum(len(v) for v in result["latencies"].values())
+    print(f"{total} requests in {result['elapsed']:.2f}s ({total / result['elapsed']:.1f} req/s), concurrency {args.concurrency}")
+    print(latency_header("status"))
+    for status, samples in sorted(result["latencies"].items(), key=lambda item: str(item[0])):
+        print(latency_row(status, samples))
+
+if __name__ == "__main__":
+    main()
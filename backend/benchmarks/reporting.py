@@ -0,0 +1,15 @@
+"""Latency summaries shared by the benchmark scripts."""
+import statistics
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def latency_header(label: str, width: int = 10) -> str:
+    return f"{label:>{width}} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)"
+
+def latency_row(label, samples: list, width: int = 10) -> str:
+    return (f"{str(label):>{width}} {len(samples):>7} {statistics.mean(samples):>9.1f} "
+            f"{percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f} "
+            f"{percentile(samples, 99):>9.1f} {max(samples):>9.1f}")
@@ -0,0 +1,202 @@
+"""
+Seed a benchmark dataset for the admissions funnel into DATABASE_URL.
+
+Creates one academic year with its terms, classes and streams. It adds
+`--students` students who are already admitted, each with an approved
+admission, a used voucher, an account and a guardian. It also adds
+`--vouchers` unused vouchers for the funnel driver. Then it writes a
+manifest (ids, voucher numbers, the shared PIN) for
+benchmarks.admissions_funnel.
+
+    python -m benchmarks.seed_admissions --year 2099/2100 \\
+        --students 20000 --vouchers 20000 --manifest funnel_seed.json
+
+Every voucher shares one PIN and every seeded account one password, so
+two hashes are computed however large the dataset. Rows are written with
+multi-row INSERTs in chunks, inside a single transaction.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from app.core.security import get_password_hash
+from app.db import base # noqa
+from app.db.session import SessionLocal
+from app.modules.academics.models import AcademicYear, ClassRoom, Stream, Term, TermStatus, YearStatus
+from app.modules.admissions.models import Admission, AdmissionStatus
+from app.modules.admissions.service import IndexNumberAllocator
+from app.modules.evoucher.models import EVoucher, VoucherStatus
+from app.modules.students.models import Gender, Guardian, Student, StudentAccount
+
+CHUNK_SIZE = 1000
+
+FIRST_NAMES = ["Ama", "Kofi", "Akosua", "Kwame", "Abena", "Yaw", "Efua", "Kwesi", "Adwoa", "Kojo", "Esi", "Fiifi"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Darko", "Ofori", "Quaye", "Tetteh"]
+CITIES = ["Accra", "Kumasi", "Tamale", "Takoradi", "Cape Coast", "Ho", "Koforidua", "Sunyani"]
+CLASS_LEVELS = [("Primary", 6), ("JHS", 3)]
+
+def insert_rows(db, model, rows: list) -> list:
+    """Multi-row INSERT in chunks; returns the new ids in row order."""
+    ids = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        ids.extend(db.execute(stmt, rows[start:start + CHUNK_SIZE]).scalars().all())
+    return ids
+
+def seed_structure(db, year_name: str, streams_per_class: int) -> dict:
+    today = date.today()
+    year = AcademicYear(name=year_name, status=YearStatus.Active, start_date=today, end_date=today + timedelta(days=365))
+    db.add(year)
+    db.flush()
+    terms = [
+        Term(academic_year_id=year.id, name=f"Term {n}", sequence=n, status=TermStatus.Active if n == 1 else TermStatus.Draft)
+        for n in range(1, 4)
+    ]
+    db.add_all(terms)
+
+    classes = []
+    for level, grades in CLASS_LEVELS:
+        for grade in range(1, grades + 1):
+            # Class names are unique across years, so qualify them with this one
+            room = ClassRoom(name=f"{level} {grade} ({year_name})", level=level)
+            db.add(room)
+            db.flush()
+            streams = [Stream(class_id=room.id, name=chr(ord("A") + n)) for n in range(streams_per_class)]
+            db.add_all(streams)
+            db.flush()
+            classes.append({"id": room.id, "level": level, "stream_ids": [s.id for s in streams]})
+    db.flush()
+    return {"academic_year_id": year.id, "term_ids": [t.id for t in terms], "classes": classes}
+
+def seed_students(db, structure: dict, year_name: str, count: int, password_hash: str, pin_hash: str, rng: random.Random):
+    year_id = structure["academic_year_id"]
+    term_id = structure["term_ids"][0]
+    now = datetime.utcnow()
+    rooms = [rng.choice(structure["classes"]) for _ in range(count)]
+    placements = [(room, rng.choice(room["stream_ids"])) for room in rooms]
+
+    students = [{
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "gender": rng.choice(list(Gender)),
+        "date_of_birth": date(2010, 1, 1) + timedelta(days=rng.randrange(3650)),
+        "nationality": "Ghanaian",
+        "city": rng.choice(CITIES),
+        "created_at": now,
+        "current_academic_year_id": year_id,
+        "current_class_id": room["id"],
+        "current_stream_id": stream_id,
+        "enrollment_status": "Active",
+    } for room, stream_id in placements]
+
+    # Index numbers drawn from the real allocator, so later approvals carry on after them
+    year_short = year_name.split("/")[0][-2:]
+    by_level = {}
+    for i, (room, _) in enumerate(placements):
+        by_level.setdefault(room["level"][:3].upper(), []).append(i)
+    for level_code, indexes in by_level.items():
+        numbers = IndexNumberAllocator.next_index_numbers(db, year_id, level_code, year_short, len(indexes))
+        for i, number in zip(indexes, numbers):
+            students[i]["index_number"] = number
+    student_ids = insert_rows(db, Student, students)
+
+    voucher_ids = insert_rows(db, EVoucher, [{
+        "voucher_number": f"BS{year_id:03d}{i:07d}",
+        "pin_hash": pin_hash,
+        "academic_year_id": year_id,
+        "status": VoucherStatus.Used,
+        "expires_at": now + timedelta(days=365),
+        "used_at": now,
+        "used_by_student_id": student_id,
+        "created_at": now,
+    } for i, student_id in enumerate(student_ids)])
+
+    insert_rows(db, Admission, [{
+        "student_id": student_id,
+        "academic_year_id": year_id,
+        "class_id": room["id"],
+        "stream_id": stream_id,
+        "term_id": term_id,
+        "voucher_id": voucher_id,
+        "status": AdmissionStatus.Approved,
+        "approved_by_admin_id": 1,
+        "approved_at": now,
+        "created_at": now,
+    } for student_id, voucher_id, (room, stream_id) in zip(student_ids, voucher_ids, placements)])
+
+    insert_rows(db, Guardian, [{
+        "student_id": student_id,
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "relationship_type": rng.choice(["Mother", "Father", "Guardian"]),
+        "phone": f"02{rng.randrange(10 ** 8):08d}",
+        "address": rng.choice(CITIES),
+    } for student_id in student_ids])
+
+    insert_rows(db, StudentAccount, [{
+        "student_id": student_id,
+        "username": f"bench_{year_id}_{i}",
+        "hashed_password": password_hash,
+        "must_change_password": False,
+        "is_active": True,
+    } for i, student_id in enumerate(student_ids)])
+
+def seed_vouchers(db, year_id: int, count: int, pin_hash: str) -> list:
+    now = datetime.utcnow()
+    numbers = [f"BV{year_id:03d}{i:07d}" for i in range(count)]
+    insert_rows(db, EVoucher, [{
+        "voucher_number": number,
+        "pin_hash": pin_hash,
+        "academic_year_id": year_id,
+        "status": VoucherStatus.Unused,
+        "expires_at": now + timedelta(days=365),
+        "created_at": now,
+    } for number in numbers])
+    return numbers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", default="2099/2100", help="name of the academic year to create; must not exist")
+    parser.add_argument("--students", type=int, default=20000, help="already-admitted students")
+    parser.add_argument("--vouchers", type=int, default=20000, help="unused vouchers for the funnel driver")
+    parser.add_argument("--streams-per-class", type=int, default=3)
+    parser.add_argument("--pin", default="123456")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for names and placements")
+    parser.add_argument("--manifest", default="funnel_seed.json")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.query(AcademicYear.id).filter(AcademicYear.name == args.year).first():
+            sys.exit(f"Academic year {args.year!r} already exists; pick another --year")
+
+        started = time.perf_counter()
+        pin_hash = get_password_hash(args.pin)
+        password_hash = get_password_hash(args.password)
+        structure = seed_structure(db, args.year, args.streams_per_class)
+        seed_students(db, structure, args.year, args.students, password_hash, pin_hash, random.Random(args.seed))
+        vouchers = seed_vouchers(db, structure["academic_year_id"], args.vouchers, pin_hash)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    manifest = {
+        **structure,
+        "year": args.year,
+        "pin": args.pin,
+        "student_password": args.password,
+        "vouchers": vouchers,
+    }
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f)
+    print(f"Seeded {args.year}: {len(structure['classes'])} classes, {args.students} students, "
+          f"{args.vouchers} vouchers in {time.perf_counter() - started:.1f}s -> {args.manifest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings picked up automatically from the working directory.
+Command-line flags in railway.toml still take precedence.
+
+Each worker keeps its own Prometheus samples, so workers write them to
+PROMETHEUS_MULTIPROC_DIR and /metrics sums them across the whole server.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "cschool-prometheus"))
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one's
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Drops the dead worker's live gauges; its counters stay in the totals
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a scratch database first
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+
+import pytest
+from fastapi.testclient import TestClient
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.modules.academics.models import AcademicYear, ClassRoom, Stream, Term
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    session.add(AcademicYear(id=1, name="2026/2027"))
+    session.add(ClassRoom(id=1, name="JHS 1", level="JHS"))
+    session.flush()
+    session.add_all([Stream(id=1, class_id=1, name="A"), Term(id=1, academic_year_id=1, name="Term 1")])
+    session.commit()
+    yield session
+    session.close()
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def voucher_session(client) -> str:
+    """Session token of a freshly verified voucher."""
+    voucher = client.post("/api/v1/evoucher/admin/vouchers", json={
+        "academic_year_id": 1, "count": 1, "expires_at": "2030-01-01T00:00:00"
+    }).json()[0]
+    return client.post("/api/v1/evoucher/verify", json=voucher).json()["voucher_session_token"]
@@ -0,0 +1,82 @@
+from app.modules.admissions.models import Admission, AdmissionStatus
+from app.modules.evoucher.models import EVoucher, VoucherStatus
+
+STUDENT = {
+    "first_name": "Ama", "last_name": "Mensah", "gender": "female",
+    "date_of_birth": "2012-01-01", "nationality": "Ghanaian", "city": "Accra",
+}
+GUARDIANS = [{"name": "Kofi Mensah", "relationship_type": "Father", "phone": "0240000000", "address": "Accra"}]
+PLACEMENT = {"academic_year_id": 1, "class_id": 1, "stream_id": 1, "term_id": 1}
+
+def new_voucher(client) -> dict:
+    return client.post("/api/v1/evoucher/admin/vouchers", json={
+        "academic_year_id": 1, "count": 1, "expires_at": "2030-01-01T00:00:00"
+    }).json()[0]
+
+def apply(client, voucher: dict) -> int:
+    token = client.post("/api/v1/evoucher/verify", json=voucher).json()["voucher_session_token"]
+    response = client.post("/api/v1/admissions/", json={
+        "voucher_session_token": token, "student": STUDENT, "guardians": GUARDIANS, "placement": PLACEMENT,
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def outcomes(response) -> dict:
+    return {item["admission_id"]: (item["success"], item["status"]) for item in response.json()["results"]}
+
+def test_bulk_approve_reports_ineligible_items(client, db):
+    pending = [apply(client, new_voucher(client)) for _ in range(3)]
+    approved = apply(client, new_voucher(client))
+    client.post(f"/api/v1/admissions/{approved}/approve")
+
+    response = client.post("/api/v1/admissions/bulk-approve", json={
+        "admission_ids": [*pending, approved, 999, pending[0]]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (3, 2)
+    assert [item["admission_id"] for item in body["results"]] == [*pending, approved, 999]
+    assert outcomes(response) == {
+        **{admission_id: (True, "Approved") for admission_id in pending},
+        approved: (False, "Approved"),
+        999: (False, None),
+    }
+    assert db.query(EVoucher).filter(EVoucher.status == VoucherStatus.Used).count() == 4
+
+def test_bulk_approve_skips_rejected_admission_whose_voucher_was_reused(client, db):
+    voucher = new_voucher(client)
+    rejected = apply(client, voucher)
+    client.post(f"/api/v1/admissions/{rejected}/reject")
+    reapplied = apply(client, voucher)
+    other = apply(client, new_voucher(client))
+    client.post(f"/api/v1/admissions/{other}/reject")
+
+    response = client.post("/api/v1/admissions/bulk-approve", json={"admission_ids": [rejected, reapplied, other]})
+
+    assert response.status_code == 200
+    assert outcomes(response) == {
+        rejected: (False, "Rejected"),
+        reapplied: (True, "Approved"),
+        other: (True, "Approved"),
+    }
+    assert client.post(f"/api/v1/admissions/{rejected}/approve").status_code == 409
+
+def test_bulk_reject_only_rejects_pending(client, db):
+    pending = [apply(client, new_voucher(client)) for _ in range(2)]
+    approved = apply(client, new_voucher(client))
+    client.post(f"/api/v1/admissions/{approved}/approve")
+
+    response = client.post("/api/v1/admissions/bulk-reject", json={"admission_ids": [*pending, approved, 999]})
+
+    assert response.status_code == 200
+    assert outcomes(response) == {
+        **{admission_id: (True, "Rejected") for admission_id in pending},
+        approved: (False, "Approved"),
+        999: (False, None),
+    }
+    db.expire_all()
+    released = db.query(EVoucher).join(Admission, Admission.voucher_id == EVoucher.id).filter(
+        Admission.status == AdmissionStatus.Rejected
+    ).all()
+    assert [voucher.status for voucher in released] == [VoucherStatus.Unused] * 2
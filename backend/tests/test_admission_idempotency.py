@@ -0,0 +1,52 @@
+from app.modules.admissions.models import Admission
+from app.shared.models.idempotency import IdempotencyKey
+
+STUDENT = {
+    "first_name": "Ama", "last_name": "Mensah", "gender": "female",
+    "date_of_birth": "2012-01-01", "nationality": "Ghanaian", "city": "Accra",
+}
+GUARDIANS = [{"name": "Kofi Mensah", "relationship_type": "Father", "phone": "0240000000", "address": "Accra"}]
+PLACEMENT = {"academic_year_id": 1, "class_id": 1, "stream_id": 1, "term_id": 1}
+
+def save_draft(client, token: str):
+    drafts = f"/api/v1/admissions/drafts/{token}"
+    assert client.patch(f"{drafts}/student", json=STUDENT).status_code == 200
+    assert client.patch(f"{drafts}/guardians", json={"guardians": GUARDIANS}).status_code == 200
+    assert client.patch(f"{drafts}/placement", json=PLACEMENT).status_code == 200
+
+def submit(client, token: str):
+    return client.post("/api/v1/admissions/", json={
+        "voucher_session_token": token, "student": STUDENT, "guardians": GUARDIANS, "placement": PLACEMENT,
+    })
+
+def test_draft_submit_after_wizard_submit_replays(client, db, voucher_session):
+    save_draft(client, voucher_session)
+    first = submit(client, voucher_session)
+    retry = client.post(f"/api/v1/admissions/drafts/{voucher_session}/submit")
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+    assert db.query(Admission).count() == 1
+
+def test_wizard_submit_after_draft_submit_replays(client, db, voucher_session):
+    save_draft(client, voucher_session)
+    first = client.post(f"/api/v1/admissions/drafts/{voucher_session}/submit")
+    retry = submit(client, voucher_session)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+    assert db.query(Admission).count() == 1
+
+def test_replay_never_stores_temp_password(client, db, voucher_session):
+    first = submit(client, voucher_session)
+    retry = submit(client, voucher_session)
+
+    assert first.json()["temp_password"]
+    assert retry.json()["temp_password"] is None
+    assert retry.json()["temp_password_withheld"] is True
+    stored = db.query(IdempotencyKey.response_body).scalar()
+    assert first.json()["temp_password"] not in stored
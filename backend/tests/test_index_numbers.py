@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from app.db.session import SessionLocal
+from app.modules.admissions.service import IndexNumberAllocator
+from app.modules.students.models import Gender, Student
+
+def allocate_block(count: int) -> list:
+    db = SessionLocal()
+    try:
+        first = IndexNumberAllocator.allocate(db, 1, "JHS", count)
+        db.commit()
+        return list(range(first, first + count))
+    finally:
+        db.close()
+
+def test_allocations_are_consecutive_per_year_and_level(db):
+    assert IndexNumberAllocator.allocate(db, 1, "JHS") == 1
+    assert IndexNumberAllocator.allocate(db, 1, "JHS", 3) == 2
+    assert IndexNumberAllocator.allocate(db, 1, "PRI", 2) == 1
+    assert IndexNumberAllocator.allocate(db, 1, "JHS") == 5
+    db.commit()
+
+def test_concurrent_allocations_never_overlap_or_leave_gaps(db):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        blocks = list(executor.map(allocate_block, [3] * 16))
+
+    values = sorted(value for block in blocks for value in block)
+    assert values == list(range(1, 49))
+
+def test_taken_index_numbers_are_skipped(db):
+    db.add(Student(first_name="Esi", last_name="Asante", gender=Gender.Female, date_of_birth=date(2012, 1, 1),
+                   nationality="Ghanaian", index_number="SCH/JHS/26/0002"))
+    db.commit()
+
+    numbers = IndexNumberAllocator.next_index_numbers(db, 1, "JHS", "26", 3)
+
+    assert numbers == ["SCH/JHS/26/0001", "SCH/JHS/26/0003", "SCH/JHS/26/0004"]
+    assert IndexNumberAllocator.next_index_number(db, 1, "JHS", "26") == "SCH/JHS/26/0005"
+
+def test_bulk_approval_issues_one_block(client, db):
+    vouchers = client.post("/api/v1/evoucher/admin/vouchers", json={
+        "academic_year_id": 1, "count": 4, "expires_at": "2030-01-01T00:00:00"
+    }).json()
+    admission_ids = []
+    for voucher in vouchers:
+        token = client.post("/api/v1/evoucher/verify", json=voucher).json()["voucher_session_token"]
+        admission_ids.append(client.post("/api/v1/admissions/", json={
+            "voucher_session_token": token,
+            "student": {"first_name": "Ama", "last_name": "Mensah", "gender": "female",
+                        "date_of_birth": "2012-01-01", "nationality": "Ghanaian"},
+            "guardians": [{"name": "Kofi Mensah", "relationship_type": "Father", "phone": "0240000000", "address": "Accra"}],
+            "placement": {"academic_year_id": 1, "class_id": 1, "stream_id": 1, "term_id": 1},
+        }).json()["id"])
+    single = client.post(f"/api/v1/admissions/{admission_ids[0]}/approve").json()
+
+    results = client.post("/api/v1/admissions/bulk-approve", json={"admission_ids": admission_ids[1:]}).json()["results"]
+
+    assert single["student_index_number"] == "SCH/JHS/26/0001"
+    assert [item["student_index_number"] for item in results] == [
+        "SCH/JHS/26/0002", "SCH/JHS/26/0003", "SCH/JHS/26/0004"
+    ]
@@ -0,0 +1,75 @@
+import hashlib
+import pytest
+from app.modules.media import storage as media_storage
+from app.modules.media.serving import IMMUTABLE_CACHE_CONTROL, LEGACY_CACHE_CONTROL
+from app.modules.media.storage import LocalStorageBackend
+
+BODY = bytes(range(256)) * 40
+DIGEST = hashlib.sha256(BODY).hexdigest()
+KEY = f"{DIGEST[:2]}/{DIGEST[2:4]}/{DIGEST}.jpg"
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch) -> LocalStorageBackend:
+    backend = LocalStorageBackend(str(tmp_path), "/media")
+    monkeypatch.setattr(media_storage, "_storage", backend)
+    return backend
+
+def put(storage: LocalStorageBackend, key: str, tmp_path) -> str:
+    source = tmp_path / "source"
+    source.write_bytes(BODY)
+    storage.save(key, str(source))
+    return f"/media/{key}"
+
+def test_content_addressed_media_is_immutable(client, storage, tmp_path):
+    response = client.get(put(storage, KEY, tmp_path))
+
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["etag"] == f'"{DIGEST}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["accept-ranges"] == "bytes"
+
+@pytest.mark.parametrize("if_none_match", [f'"{DIGEST}"', f'W/"{DIGEST}"', f'"other", "{DIGEST}"', "*"])
+def test_matching_etag_is_not_modified(client, storage, tmp_path, if_none_match):
+    response = client.get(put(storage, KEY, tmp_path), headers={"If-None-Match": if_none_match})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{DIGEST}"'
+
+def test_range_returns_partial_content(client, storage, tmp_path):
+    url = put(storage, KEY, tmp_path)
+
+    response = client.get(url, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == BODY[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(BODY)}"
+
+    suffix = client.get(url, headers={"Range": "bytes=-10"})
+    assert suffix.status_code == 206
+    assert suffix.content == BODY[-10:]
+
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(BODY)}-"})
+    assert unsatisfiable.status_code == 416
+
+def test_stale_if_range_sends_the_whole_file(client, storage, tmp_path):
+    response = client.get(put(storage, KEY, tmp_path), headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.content == BODY
+
+def test_legacy_upload_gets_a_file_etag(client, storage, tmp_path):
+    url = put(storage, "0b5e1d2c-legacy-photo.jpeg", tmp_path)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["cache-control"] == LEGACY_CACHE_CONTROL
+
+    cached = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+@pytest.mark.parametrize("key", ["missing.jpg", ".hidden.jpg", "ab/../../etc/passwd", "ab//x.jpg"])
+def test_unknown_or_hidden_keys_are_not_found(client, storage, key):
+    assert client.get(f"/media/{key}").status_code == 404
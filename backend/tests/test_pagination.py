@@ -0,0 +1,68 @@
+from datetime import date, datetime
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import decode_cursor, encode_cursor
+from app.modules.evoucher.models import VoucherStatus
+from app.modules.students.models import Gender, Student
+
+def test_cursor_round_trip_keeps_types():
+    values = [datetime(2026, 9, 1, 8, 30, 15, 120), date(2012, 1, 1), VoucherStatus.Unused, "Mensah", 42, None]
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime, date, VoucherStatus, str, int, int)) == values
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor(None, (int,)) is None
+    assert decode_cursor("", (int,)) is None
+
+@pytest.mark.parametrize("cursor, types", [
+    ("not-a-cursor!", (int,)),
+    (encode_cursor([1, 2]), (int,)),
+    (encode_cursor(["1"]), (int,)),
+    (encode_cursor([True]), (int,)),
+    (encode_cursor(["Lost"]), (VoucherStatus,)),
+    (encode_cursor([{"__dt__": "yesterday"}]), (datetime,)),
+])
+def test_tampered_cursor_is_a_400(cursor, types):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, types)
+    assert exc.value.status_code == 400
+
+def _pages(client, url: str, **params):
+    items, cursor = [], None
+    while True:
+        page = client.get(url, params={**params, "cursor": cursor} if cursor else params).json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items
+
+def test_voucher_listing_pages_without_gaps_or_repeats(client, db):
+    client.post("/api/v1/evoucher/admin/vouchers", json={
+        "academic_year_id": 1, "count": 7, "expires_at": "2030-01-01T00:00:00"
+    })
+
+    items = _pages(client, "/api/v1/evoucher/admin/vouchers", size=3, count="none")
+
+    ids = [item["id"] for item in items]
+    assert ids == sorted(ids)
+    assert len(ids) == len(set(ids)) == 7
+
+def test_student_directory_pages_through_name_ties(client, db):
+    # Shared last and first names, so the id tie-breaker decides the order
+    for first_name in ["Kofi", "Ama", "Ama", "Yaw", "Ama"]:
+        db.add(Student(first_name=first_name, last_name="Mensah", gender=Gender.Female,
+                       date_of_birth=date(2012, 1, 1), nationality="Ghanaian"))
+    db.add(Student(first_name="Esi", last_name="Asante", gender=Gender.Female,
+                   date_of_birth=date(2012, 1, 1), nationality="Ghanaian"))
+    db.commit()
+
+    for sort in ["name", "newest"]:
+        items = _pages(client, "/api/v1/students/directory", size=2, sort=sort)
+        assert len({item["id"] for item in items}) == len(items) == 6
+
+    by_name = _pages(client, "/api/v1/students/directory", size=2, sort="name")
+    assert [(item["last_name"], item["first_name"]) for item in by_name] == [
+        ("Asante", "Esi"), ("Mensah", "Ama"), ("Mensah", "Ama"), ("Mensah", "Ama"), ("Mensah", "Kofi"), ("Mensah", "Yaw")
+    ]
@@ -0,0 +1,79 @@
+import pytest
+from app.core import throttling
+from app.core.throttling import InMemorySlidingWindowStore, Throttle
+from app.modules.evoucher import service
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    time = monotonic
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(throttling, "time", clock)
+    return clock
+
+def test_limit_applies_within_the_window(clock):
+    throttle = Throttle(InMemorySlidingWindowStore(), "test", limit=3, window_seconds=60)
+
+    for _ in range(2):
+        throttle.hit("1.2.3.4")
+        clock.now += 10
+    assert not throttle.is_limited("1.2.3.4")
+
+    throttle.hit("1.2.3.4")
+    assert throttle.is_limited("1.2.3.4")
+    assert not throttle.is_limited("5.6.7.8")
+
+def test_window_slides_one_event_at_a_time(clock):
+    throttle = Throttle(InMemorySlidingWindowStore(), "test", limit=3, window_seconds=60)
+    for _ in range(3):
+        throttle.hit("key")
+        clock.now += 10
+
+    # First hit at t=0 leaves the window at t=60, the second at t=70
+    clock.now = 1000.0 + 59
+    assert throttle.is_limited("key")
+    clock.now = 1000.0 + 60
+    assert not throttle.is_limited("key")
+    assert throttle.hit("key") == 3
+    assert throttle.is_limited("key")
+
+def test_reset_and_empty_keys(clock):
+    throttle = Throttle(InMemorySlidingWindowStore(), "test", limit=1, window_seconds=60)
+    throttle.hit("key")
+    throttle.reset("key")
+    assert not throttle.is_limited("key")
+
+    assert throttle.hit(None) == 0
+    assert not throttle.is_limited("")
+
+def test_store_evicts_least_recently_hit_keys(clock):
+    store = InMemorySlidingWindowStore(max_keys=2)
+    for key in ["a", "b", "a", "c"]:
+        store.hit(key, 60)
+
+    assert store.count("a", 60) == 2
+    assert store.count("b", 60) == 0
+    assert store.count("c", 60) == 1
+
+def test_failed_pins_throttle_the_voucher_number(client, db, monkeypatch):
+    store = InMemorySlidingWindowStore()
+    monkeypatch.setattr(service.verify_ip_throttle, "store", store)
+    monkeypatch.setattr(service.verify_number_throttle, "store", store)
+    voucher = client.post("/api/v1/evoucher/admin/vouchers", json={
+        "academic_year_id": 1, "count": 1, "expires_at": "2030-01-01T00:00:00"
+    }).json()[0]
+    wrong = {"voucher_number": voucher["voucher_number"], "pin": f"{(int(voucher['pin']) + 1) % 10**6:06d}"}
+
+    for _ in range(service.verify_number_throttle.limit):
+        assert client.post("/api/v1/evoucher/verify", json=wrong).json()["reason"] == "Invalid Pin"
+    throttled = client.post("/api/v1/evoucher/verify", json=voucher)
+
+    assert throttled.status_code == 429
+    assert throttled.headers["Retry-After"] == str(service.verify_number_throttle.window_seconds)